@@ -1,10 +1,21 @@
-import tkinter as tk
-from src.gui.gui import PedestrianDetectionApp
+import sys
 
 def main():
     """
     Entry point for the Pedestrian Detection Application.
+
+    Runs the command line pipeline when started with ``--headless``,
+    otherwise opens the GUI.
     """
+    argv = sys.argv[1:]
+    if "--headless" in argv:
+        from src.cli import main as cli_main
+        argv.remove("--headless")
+        sys.exit(cli_main(argv))
+    
+    import tkinter as tk
+    from src.gui.gui import PedestrianDetectionApp
+    
     root = tk.Tk()
     app = PedestrianDetectionApp(root)
     root.mainloop()
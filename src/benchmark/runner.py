@@ -0,0 +1,250 @@
+"""
+Per-stage benchmark of the detect/track/render pipeline on synthetic videos.
+"""
+
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import cv2
+import numpy as np
+from src.benchmark.synthetic import StubDetector, generate_video
+from src.detection.detector import PedestrianDetector
+from src.pipeline.pipeline import FrameResult, Pipeline
+from src.roi.roi_manager import define_roi
+from src.tracking.tracker import Tracker
+from src.utils.utils import resize_frame, points_in_polygon
+from src.video.video_processor import VideoProcessor, create_video_writer
+from src.config.config import THRESHOLD_CENTERS, FRAME_MAX, PATIENCE, VIDEO_SCALE_PERCENT, VIDEO_IO_BACKEND
+
+STAGES = ("decode", "resize", "detect", "track", "overlay", "encode")
+
+PERCENTILES = (50, 90, 99)
+
+# Version of the result layout, bumped when fields change meaning
+SCHEMA_VERSION = 1
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident set size of the current process.
+
+    Returns:
+        float: Peak RSS in MiB, or None where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    """
+    Summarizes the per-frame latencies of one stage.
+
+    Args:
+        latencies (list): Latency of every frame, in seconds.
+
+    Returns:
+        dict: Total seconds, throughput, and mean and percentile latencies in milliseconds.
+    """
+    values = np.asarray(latencies) * 1000
+    total = float(values.sum()) / 1000
+    summary = {
+        "seconds": round(total, 4),
+        "fps": round(len(values) / total, 2) if total > 0 else None,
+        "mean_ms": round(float(values.mean()), 4) if len(values) else None
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = round(float(np.percentile(values, percentile)), 4) if len(values) else None
+    return summary
+
+
+def make_detector(name: str):
+    """
+    Creates the detector of a benchmark run.
+
+    Args:
+        name (str): "stub", or the name of an inference backend.
+
+    Returns:
+        StubDetector or PedestrianDetector: The detector.
+    """
+    return StubDetector() if name == "stub" else PedestrianDetector(backend=name)
+
+
+def benchmark_rois(width: int, height: int) -> List[Dict]:
+    """
+    Splits the frame into a left and a right region.
+
+    Args:
+        width (int): Frame width.
+        height (int): Frame height.
+
+    Returns:
+        list: Two ROI dictionaries.
+    """
+    middle = width // 2
+    return [
+        define_roi([(0, 0), (middle, 0), (middle, height - 1), (0, height - 1)], "left", width, height),
+        define_roi([(middle, 0), (width - 1, 0), (width - 1, height - 1), (middle, height - 1)], "right", width, height)
+    ]
+
+
+def run_scenario(scenario: Dict) -> Dict:
+    """
+    Benchmarks one synthetic video.
+
+    Every stage is first timed separately on each frame in a single thread, then
+    the threaded Pipeline is timed end to end on the same video. Meant to run in
+    its own process so the reported peak RSS belongs to this scenario only.
+
+    Args:
+        scenario (dict): Keys "width", "height", "frames", "density", "seed",
+            "detector", "scale_percent" and "work_dir".
+
+    Returns:
+        dict: The scenario settings with per-stage statistics, end-to-end fps and peak RSS.
+    """
+    width, height = scenario["width"], scenario["height"]
+    name = f"{width}x{height}_{scenario['frames']}f_{scenario['density']}p"
+    video_path = os.path.join(scenario["work_dir"], f"synthetic_{name}_s{scenario['seed']}.mp4")
+    if not os.path.exists(video_path):
+        generate_video(
+            video_path, width, height, scenario["frames"], scenario["density"], seed=scenario["seed"]
+        )
+    
+    detector = make_detector(scenario["detector"])
+    video_processor = VideoProcessor(video_path)
+    scale_percent = scenario["scale_percent"]
+    frame_width, frame_height = int(width * scale_percent / 100), int(height * scale_percent / 100)
+    rois = benchmark_rois(frame_width, frame_height)
+    renderer = Pipeline(video_processor, rois, scenario["work_dir"], detector=detector, show_progress=False)
+    tracker = Tracker(threshold_centers=THRESHOLD_CENTERS, frame_max=FRAME_MAX, patience=PATIENCE)
+    writer = create_video_writer(
+        os.path.join(scenario["work_dir"], f"encoded_{name}.mp4"),
+        video_processor.fps or 25.0,
+        (frame_width, frame_height)
+    )
+    
+    latencies = {stage: [] for stage in STAGES}
+    clock = time.perf_counter
+    frame_idx = 0
+    while True:
+        started = clock()
+        is_frame, frame = video_processor.get_frame()
+        if not is_frame:
+            break
+        resize_started = clock()
+        frame = resize_frame(frame, scale_percent)
+        detect_started = clock()
+        detections = detector.predict(frame)
+        track_started = clock()
+        centers = detections.centers
+        ids, is_new = tracker.update(centers, frame_idx)
+        roi_mask = np.stack([points_in_polygon(centers, roi['polygon']) for roi in rois])
+        overlay_started = clock()
+        result = FrameResult(frame_idx, detections, ids, is_new, roi_mask, renderer.roi_counts)
+        frame = renderer.annotate(frame, result)
+        encode_started = clock()
+        writer.write(frame)
+        ended = clock()
+        for stage, (begin, end) in zip(STAGES, [
+            (started, resize_started), (resize_started, detect_started), (detect_started, track_started),
+            (track_started, overlay_started), (overlay_started, encode_started), (encode_started, ended)
+        ]):
+            latencies[stage].append(end - begin)
+        frame_idx += 1
+    video_processor.release()
+    writer.release()
+    
+    # End-to-end run with the threaded stages, counts and rendering at the configured scale
+    video_processor = VideoProcessor(video_path)
+    pipeline = Pipeline(
+        video_processor, benchmark_rois(video_processor.width, video_processor.height), scenario["work_dir"],
+        detector=detector, show_progress=False
+    )
+    started = clock()
+    roi_counts = pipeline.run()
+    pipeline_seconds = clock() - started
+    
+    sequential_seconds = sum(sum(values) for values in latencies.values())
+    return dict(
+        scenario,
+        name=name,
+        frames_processed=frame_idx,
+        stages={stage: summarize(values) for stage, values in latencies.items()},
+        sequential_fps=round(frame_idx / sequential_seconds, 2) if sequential_seconds > 0 else None,
+        pipeline_fps=round(frame_idx / pipeline_seconds, 2) if pipeline_seconds > 0 else None,
+        roi_counts=roi_counts,
+        peak_rss_mb=peak_rss_mb()
+    )
+
+
+def environment() -> Dict:
+    """
+    Describes the machine and library versions the benchmark ran with.
+
+    Returns:
+        dict: Python, platform, CPU count, NumPy and OpenCV versions, and the video
+            I/O backend.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "video_io_backend": VIDEO_IO_BACKEND
+    }
+
+
+def run_benchmarks(
+    resolutions: List[tuple],
+    frames: int,
+    densities: List[int],
+    work_dir: str,
+    detector: str = "stub",
+    scale_percent: int = VIDEO_SCALE_PERCENT,
+    seed: int = 0
+) -> Dict:
+    """
+    Benchmarks every combination of resolution and density.
+
+    Each scenario runs in a fresh process so peak memory is measured per scenario.
+    Generated videos are kept in work_dir and reused by later runs.
+
+    Args:
+        resolutions (list): (width, height) of the synthetic videos.
+        frames (int): Number of frames per video.
+        densities (list): Numbers of people per frame.
+        work_dir (str): Directory for the synthetic and encoded videos.
+        detector (str): "stub" for the weight-free blob detector, or an inference backend.
+        scale_percent (int): Scale applied by the resize stage.
+        seed (int): Seed of the synthetic videos.
+
+    Returns:
+        dict: JSON-serialisable report with the environment and one entry per scenario.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for width, height in resolutions:
+        for density in densities:
+            scenario = {
+                "width": width,
+                "height": height,
+                "frames": frames,
+                "density": density,
+                "seed": seed,
+                "detector": detector,
+                "scale_percent": scale_percent,
+                "work_dir": work_dir
+            }
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                results.append(executor.submit(run_scenario, scenario).result())
+    return {"schema_version": SCHEMA_VERSION, "environment": environment(), "scenarios": results}
\ No newline at end of file
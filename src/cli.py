@@ -0,0 +1,690 @@
+"""
+Command line interface for running the pedestrian counter without the GUI.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from src.video.video_processor import VideoProcessor
+from src.video.stream import LiveSource
+from src.roi.roi_manager import ROIManager, DEFAULT_CAMERA, load_rois, save_rois
+from src.pipeline.pipeline import Pipeline, DETECTION_MODES
+from src.pipeline.sharding import process_sharded
+from src.pipeline.checkpoint import get_checkpoint_path
+from src.pipeline.batch import run_batch
+from src.pipeline.multistream import MultiStreamScheduler, load_stream_specs
+from src.pipeline.sweep import load_ground_truth, run_sweep
+from src.output.summary import TrackSummary, write_summary
+from src.output.rolling import RollingCounts, LiveReporter
+from src.output.timeseries import TimeSeriesWriter, get_timeseries_path
+from src.detection.backends import BACKENDS, export_model
+from src.detection.compare import compare_backends, read_sample_frames
+from src.benchmark.runner import STAGES, run_benchmarks
+from src.metrics.metrics import Metrics, MetricsReporter
+from src.config.config import (
+    THRESHOLD_CENTERS, FRAME_MAX, PATIENCE, DETECTOR_BACKEND, DETECTION_MODE, BATCH_SIZE, RENDER_OUTPUT, INFERENCE_STRIDE, MOTION_GATE, VIDEO_SCALE_PERCENT,
+    CHECKPOINT_INTERVAL, DETECTION_CACHE_DIR, METRICS_ENABLED, METRICS_INTERVAL, METRICS_FILE, METRICS_PORT,
+    STREAM_QUEUE_SIZE, ROLLING_WINDOW_SECONDS, STREAM_REPORT_INTERVAL
+)
+
+COMMANDS = ("run", "batch", "select-rois", "stream", "serve", "export", "compare-backends", "benchmark", "sweep")
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser, render_help: str):
+    """
+    Adds the options forwarded to every Pipeline of a command.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the command.
+        render_help (str): Help text of the --no-render flag.
+    """
+    parser.add_argument(
+        "--detection-mode",
+        choices=DETECTION_MODES,
+        default=DETECTION_MODE,
+        help="Run the detector per ROI crop or once per frame."
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Frames per inference batch.")
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=INFERENCE_STRIDE,
+        help="Run the detector on every k-th frame and extrapolate the tracks in between."
+    )
+    parser.add_argument(
+        "--motion-gate",
+        action="store_true",
+        default=MOTION_GATE,
+        help="Skip the detector for ROIs without motion since their last detection."
+    )
+    parser.add_argument("--no-render", dest="render", action="store_false", default=RENDER_OUTPUT, help=render_help)
+
+
+def add_cache_argument(parser: argparse.ArgumentParser):
+    """
+    Adds the detection cache option to a command processing video files.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the command.
+    """
+    parser.add_argument(
+        "--detection-cache",
+        default=DETECTION_CACHE_DIR,
+        help="Directory caching the detections, replayed by later runs on the same videos and model."
+    )
+
+
+def add_timeseries_argument(parser: argparse.ArgumentParser):
+    """
+    Adds the time series option to a command.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the command.
+    """
+    parser.add_argument(
+        "--timeseries",
+        action="store_true",
+        help="Write per-frame detections, region entries/exits and counts to <output-dir>/TimeSeries_<name>."
+    )
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the metrics export options of a command.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the command.
+    """
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        default=METRICS_ENABLED,
+        help="Record per-stage metrics and log them as a JSON line periodically (single-process runs)."
+    )
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL, help="Seconds between metrics reports.")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, help="Prometheus text file rewritten with the metrics.")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="Serve the metrics on http://host:PORT/metrics.")
+
+
+def create_metrics(args: argparse.Namespace) -> Optional[Metrics]:
+    """
+    Creates the metrics registry when any metrics option is set.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        Metrics: The registry, or None when metrics are disabled.
+    """
+    if not (args.metrics or args.metrics_file or args.metrics_port is not None):
+        return None
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return Metrics()
+
+
+def run_with_metrics(
+    pipeline: Pipeline,
+    metrics: Optional[Metrics],
+    args: argparse.Namespace,
+    start_frame: int = 0
+) -> Dict[str, int]:
+    """
+    Runs a pipeline, publishing its metrics while it runs.
+
+    Args:
+        pipeline (Pipeline): The pipeline to run.
+        metrics (Metrics, optional): Registry passed to the pipeline, None when disabled.
+        args (argparse.Namespace): Parsed command line arguments with the metrics options.
+        start_frame (int): First frame to process.
+
+    Returns:
+        dict: Number of people counted per region.
+    """
+    if metrics is None:
+        return pipeline.run(start_frame=start_frame)
+    with MetricsReporter(metrics, args.metrics_interval, path=args.metrics_file, port=args.metrics_port):
+        return pipeline.run(start_frame=start_frame)
+
+
+def parse_resolution(value: str) -> tuple:
+    """
+    Parses a WIDTHxHEIGHT resolution.
+
+    Args:
+        value (str): Resolution such as "1280x720".
+
+    Returns:
+        tuple: (width, height).
+    """
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid resolution: {value}")
+    return width, height
+
+
+def get_pipeline_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Collects the Pipeline keyword arguments from the parsed command line.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        dict: Keyword arguments for Pipeline.
+    """
+    options = {
+        "detection_mode": args.detection_mode,
+        "batch_size": args.batch_size,
+        "render": args.render,
+        "inference_stride": args.stride,
+        "motion_gate": args.motion_gate
+    }
+    if "detection_cache" in args:
+        options["detection_cache_dir"] = args.detection_cache
+    return options
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser for the headless commands.
+
+    Returns:
+        argparse.ArgumentParser: The configured parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Headless people counter."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = subparsers.add_parser("run", help="Process a single video.")
+    run_parser.add_argument("video", help="Path to the input video file.")
+    run_parser.add_argument("--output-dir", required=True, help="Directory for the annotated video.")
+    run_parser.add_argument("--rois", required=True, help="JSON or YAML file with the ROI definitions.")
+    run_parser.add_argument("--camera", help="Camera entry of the ROI file to use.")
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Split the video into this many segments processed in parallel processes."
+    )
+    run_parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Periodically save the state of the run to <output-dir>/Checkpoint_<video>.npz."
+    )
+    run_parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=CHECKPOINT_INTERVAL,
+        help="Frames between two checkpoints."
+    )
+    run_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the last checkpoint of the video, if any; implies --checkpoint."
+    )
+    add_pipeline_arguments(run_parser, "Skip drawing and encoding the annotated video; only write counts and tracks.")
+    add_cache_argument(run_parser)
+    add_timeseries_argument(run_parser)
+    add_metrics_arguments(run_parser)
+    run_parser.set_defaults(func=run_command)
+    
+    batch_parser = subparsers.add_parser("batch", help="Process every video of a directory or glob.")
+    batch_parser.add_argument("source", help="Directory or glob pattern of the input videos.")
+    batch_parser.add_argument("--output-dir", required=True, help="Directory for the annotated videos.")
+    batch_parser.add_argument("--rois", required=True, help="JSON or YAML file with the ROI definitions shared by all videos.")
+    batch_parser.add_argument("--camera", help="Camera entry of the ROI file to use.")
+    batch_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    batch_parser.add_argument("--manifest", help="Results manifest (JSON Lines). Defaults to <output-dir>/manifest.jsonl.")
+    add_pipeline_arguments(batch_parser, "Skip the annotated videos; only write the manifest.")
+    add_cache_argument(batch_parser)
+    batch_parser.set_defaults(func=batch_command)
+    
+    stream_parser = subparsers.add_parser("stream", help="Count people on a live camera or stream.")
+    stream_parser.add_argument("source", help="RTSP/HTTP URL, camera device index (e.g. 0), or a video file.")
+    stream_parser.add_argument("--output-dir", required=True, help="Directory for the counts and the annotated video.")
+    stream_parser.add_argument("--rois", required=True, help="JSON or YAML file with the ROI definitions.")
+    stream_parser.add_argument("--camera", help="Camera entry of the ROI file to use.")
+    stream_parser.add_argument("--loop", action="store_true", help="Replay a file source endlessly, in real time.")
+    stream_parser.add_argument(
+        "--window",
+        type=float,
+        default=ROLLING_WINDOW_SECONDS,
+        help="Length, in seconds, of the rolling counts."
+    )
+    stream_parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=STREAM_REPORT_INTERVAL,
+        help="Seconds between two status lines."
+    )
+    stream_parser.add_argument("--status-log", help="JSON Lines file the status lines are appended to.")
+    add_pipeline_arguments(stream_parser, "Skip the annotated video; only report counts.")
+    add_metrics_arguments(stream_parser)
+    add_timeseries_argument(stream_parser)
+    # Small batches keep the latency of live sources low
+    stream_parser.set_defaults(func=stream_command, batch_size=1)
+    
+    serve_parser = subparsers.add_parser("serve", help="Serve many live streams with one shared model.")
+    serve_parser.add_argument("streams", help="JSON or YAML list of streams: name, source, and optionally camera and loop.")
+    serve_parser.add_argument("--output-dir", required=True, help="Directory for the counts and annotated videos.")
+    serve_parser.add_argument("--rois", required=True, help="ROI file; each stream uses the entry of its camera.")
+    serve_parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=STREAM_REPORT_INTERVAL,
+        help="Seconds between two status lines."
+    )
+    serve_parser.add_argument("--status-log", help="JSON Lines file the status lines are appended to.")
+    add_pipeline_arguments(serve_parser, "Skip the annotated videos; only report counts.")
+    serve_parser.set_defaults(func=serve_command)
+    
+    select_parser = subparsers.add_parser("select-rois", help="Draw ROIs on a video frame and save them.")
+    select_parser.add_argument("video", help="Video whose first frame is used to draw the regions.")
+    select_parser.add_argument("--regions", required=True, help="Comma-separated region names.")
+    select_parser.add_argument("--rois", required=True, help="JSON or YAML file to save the ROIs to.")
+    select_parser.add_argument("--camera", default=DEFAULT_CAMERA, help="Camera entry to store the ROIs under.")
+    select_parser.set_defaults(func=select_rois_command)
+    
+    export_parser = subparsers.add_parser("export", help="Export the YOLO weights for an ONNX Runtime or OpenVINO backend.")
+    export_parser.add_argument("--backend", choices=("onnxruntime", "openvino"), default="onnxruntime")
+    export_parser.add_argument("--int8", action="store_true", help="Quantise the exported model to int8.")
+    export_parser.set_defaults(func=export_command)
+    
+    compare_parser = subparsers.add_parser("compare-backends", help="Compare the speed and detections of inference backends.")
+    compare_parser.add_argument("video", help="Video whose frames are used for the comparison.")
+    compare_parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=list(BACKENDS[:2]),
+        help="Backends to compare; the first one is the accuracy reference."
+    )
+    compare_parser.add_argument("--frames", type=int, default=100, help="Number of frames to detect on.")
+    compare_parser.add_argument("--step", type=int, default=1, help="Use one frame out of STEP.")
+    compare_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Frames per inference batch.")
+    compare_parser.set_defaults(func=compare_command)
+    
+    benchmark_parser = subparsers.add_parser("benchmark", help="Time every pipeline stage on synthetic videos.")
+    benchmark_parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        type=parse_resolution,
+        default=[(640, 360), (1280, 720)],
+        help="Video sizes as WIDTHxHEIGHT."
+    )
+    benchmark_parser.add_argument("--frames", type=int, default=300, help="Frames per synthetic video.")
+    benchmark_parser.add_argument("--densities", nargs="+", type=int, default=[5, 20], help="People per frame.")
+    benchmark_parser.add_argument(
+        "--detector",
+        choices=("stub",) + BACKENDS,
+        default="stub",
+        help="Weight-free blob detector, or a real inference backend."
+    )
+    benchmark_parser.add_argument("--scale", type=int, default=VIDEO_SCALE_PERCENT, help="Resize stage scale, in percent.")
+    benchmark_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic videos.")
+    benchmark_parser.add_argument("--work-dir", default="benchmark_videos", help="Directory for the generated videos.")
+    benchmark_parser.add_argument("--output", help="JSON report path, to diff between releases.")
+    benchmark_parser.set_defaults(func=benchmark_command)
+    
+    sweep_parser = subparsers.add_parser("sweep", help="Tune the tracker settings and ROIs against ground-truth counts.")
+    sweep_parser.add_argument("video", help="Path to the input video file.")
+    sweep_parser.add_argument("--rois", nargs="+", required=True, help="ROI files to compare.")
+    sweep_parser.add_argument("--camera", help="Camera entry of the ROI files to use.")
+    sweep_parser.add_argument(
+        "--ground-truth",
+        required=True,
+        help="JSON file with the true count per region, e.g. {\"entrance\": 12}."
+    )
+    sweep_parser.add_argument("--threshold-centers", nargs="+", type=float, default=[THRESHOLD_CENTERS])
+    sweep_parser.add_argument("--frame-max", nargs="+", type=int, default=[FRAME_MAX])
+    sweep_parser.add_argument("--patience", nargs="+", type=int, default=[PATIENCE])
+    sweep_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    sweep_parser.add_argument(
+        "--detection-cache",
+        default=DETECTION_CACHE_DIR or "detection_cache",
+        help="Directory of the detection cache; the detector only runs on frames missing from it."
+    )
+    sweep_parser.add_argument("--backend", choices=BACKENDS, default=DETECTOR_BACKEND, help="Detector backend.")
+    sweep_parser.add_argument("--top", type=int, help="Only print the best TOP combinations.")
+    sweep_parser.add_argument("--output", help="JSON file for all the results.")
+    sweep_parser.set_defaults(func=sweep_command)
+    return parser
+
+
+def run_command(args: argparse.Namespace) -> int:
+    """
+    Processes a single video and prints the per-region counts.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    os.makedirs(args.output_dir, exist_ok=True)
+    video_processor = VideoProcessor(args.video)
+    rois = load_rois(args.rois, video_processor.width, video_processor.height, args.camera)
+    checkpoint = args.checkpoint or args.resume
+    if checkpoint and args.workers > 1:
+        raise ValueError("Checkpoints are only supported with --workers 1")
+    if args.timeseries and args.workers > 1:
+        raise ValueError("The time series is only supported with --workers 1")
+    if args.workers > 1:
+        video_processor.release()
+        result = process_sharded(args.video, rois, args.output_dir, args.workers, **get_pipeline_options(args))
+        roi_counts, output_video_path = result["roi_counts"], result["output_video_path"]
+        tracks = None
+    else:
+        metrics = create_metrics(args)
+        pipeline = Pipeline(
+            video_processor,
+            rois,
+            args.output_dir,
+            metrics=metrics,
+            checkpoint_path=get_checkpoint_path(args.output_dir, args.video) if checkpoint else None,
+            checkpoint_interval=args.checkpoint_interval,
+            **get_pipeline_options(args)
+        )
+        track_summary = TrackSummary([roi['name'] for roi in rois])
+        pipeline.add_result_listener(track_summary)
+        timeseries = None
+        if args.timeseries:
+            timeseries = TimeSeriesWriter(
+                get_timeseries_path(args.output_dir, args.video), [roi['name'] for roi in rois], video_processor.fps
+            )
+            pipeline.add_result_listener(timeseries)
+        start_frame = pipeline.load_checkpoint() if args.resume else 0
+        if start_frame:
+            print(f"Resuming from frame {start_frame}")
+        try:
+            roi_counts = run_with_metrics(pipeline, metrics, args, start_frame)
+        finally:
+            if timeseries is not None:
+                timeseries.close()
+        output_video_path = pipeline.output_video_path
+        tracks = track_summary.to_list()
+    
+    summary_path = os.path.join(
+        args.output_dir, f"Counts_{os.path.basename(args.video).split('.')[0]}.json"
+    )
+    write_summary(summary_path, args.video, roi_counts, tracks)
+    for region, count in roi_counts.items():
+        print(f"People in {region}: {count}")
+    print(f"Counts saved at: {summary_path}")
+    if args.render:
+        print(f"Annotated video saved at: {output_video_path}")
+    if args.timeseries:
+        print(f"Time series saved at: {get_timeseries_path(args.output_dir, args.video)}")
+    return 0
+
+
+def stream_command(args: argparse.Namespace) -> int:
+    """
+    Counts people on a live source until it ends or the user presses Ctrl+C.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    os.makedirs(args.output_dir, exist_ok=True)
+    source = LiveSource(args.source, loop=args.loop)
+    rois = load_rois(args.rois, source.width, source.height, args.camera)
+    metrics = create_metrics(args)
+    pipeline = Pipeline(
+        source, rois, args.output_dir,
+        queue_size=STREAM_QUEUE_SIZE,
+        show_progress=False,
+        metrics=metrics,
+        **get_pipeline_options(args)
+    )
+    if metrics is not None:
+        metrics.gauge_function("source_dropped_frames", lambda: source.dropped)
+        metrics.gauge_function("source_fps", lambda: source.stats()["source_fps"] or 0)
+    rolling_counts = RollingCounts([roi['name'] for roi in rois], args.window)
+    reporter = LiveReporter(source, rolling_counts, args.report_interval, path=args.status_log)
+    pipeline.add_result_listener(rolling_counts)
+    pipeline.add_result_listener(reporter)
+    timeseries = None
+    if args.timeseries:
+        # Live frames are timestamped with the wall clock
+        timeseries = TimeSeriesWriter(
+            get_timeseries_path(args.output_dir, args.source), [roi['name'] for roi in rois], 0, window_seconds=args.window
+        )
+        pipeline.add_result_listener(timeseries)
+    try:
+        roi_counts = run_with_metrics(pipeline, metrics, args)
+    except KeyboardInterrupt:
+        roi_counts = pipeline.roi_counts
+        print("Stopped.")
+    finally:
+        if timeseries is not None:
+            timeseries.close()
+    reporter.report()
+    
+    name = os.path.basename(args.source.rstrip("/")).split('.')[0] or "stream"
+    summary_path = os.path.join(args.output_dir, f"Counts_{name}.json")
+    write_summary(summary_path, args.source, roi_counts)
+    for region, count in roi_counts.items():
+        print(f"People in {region}: {count}")
+    print(f"Counts saved at: {summary_path}")
+    if args.timeseries:
+        print(f"Time series saved at: {get_timeseries_path(args.output_dir, args.source)}")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """
+    Serves several live streams with one shared detector until they end or the
+    user presses Ctrl+C.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    os.makedirs(args.output_dir, exist_ok=True)
+    scheduler = MultiStreamScheduler(
+        load_stream_specs(args.streams), args.rois, args.output_dir, **get_pipeline_options(args)
+    )
+    
+    def report(status):
+        line = json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "streams": status})
+        print(line, flush=True)
+        if args.status_log:
+            with open(args.status_log, "a") as f:
+                f.write(line + "\n")
+    
+    try:
+        counts = scheduler.run(report=report, report_interval=args.report_interval)
+    except KeyboardInterrupt:
+        counts = {stream.name: dict(stream.pipeline.roi_counts) for stream in scheduler.streams}
+        print("Stopped.")
+    report(scheduler.status())
+    for stream in scheduler.streams:
+        summary_path = os.path.join(args.output_dir, f"Counts_{stream.name}.json")
+        write_summary(summary_path, stream.source.video_path, counts[stream.name])
+        print(f"{stream.name}: {counts[stream.name]}")
+    return 0
+
+
+def batch_command(args: argparse.Namespace) -> int:
+    """
+    Processes a folder of videos and prints a summary line per clip.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code, 1 if any clip failed.
+    """
+    entries = run_batch(
+        args.source, args.rois, args.output_dir, args.workers,
+        manifest_path=args.manifest,
+        camera=args.camera,
+        **get_pipeline_options(args)
+    )
+    failed = 0
+    for entry in entries:
+        if entry["status"] == "ok":
+            print(f"{entry['video']}: {entry['roi_counts']} ({entry['seconds']}s)")
+        else:
+            failed += 1
+            print(f"{entry['video']}: FAILED {entry['error']}")
+    print(f"Processed {len(entries) - failed}/{len(entries)} videos")
+    return 1 if failed else 0
+
+
+def select_rois_command(args: argparse.Namespace) -> int:
+    """
+    Lets the user click the ROIs on the first frame and saves them for unattended runs.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    video_processor = VideoProcessor(args.video) if os.path.isfile(args.video) else LiveSource(args.video)
+    frame = video_processor.read_preview_frame()
+    video_processor.release()
+    regions = [name.strip() for name in args.regions.split(",")]
+    rois = ROIManager(args.video, regions, frame=frame).select_rois()
+    save_rois(args.rois, rois, video_processor.width, video_processor.height, args.camera)
+    print(f"Saved {len(rois)} ROIs for camera '{args.camera}' to {args.rois}")
+    return 0
+
+
+def export_command(args: argparse.Namespace) -> int:
+    """
+    Exports the model for an exported-model backend.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    path = export_model(args.backend, int8=args.int8)
+    setting = "ONNX_MODEL_PATH" if args.backend == "onnxruntime" else "OPENVINO_MODEL_PATH"
+    print(f"Exported model saved at: {path}")
+    print(f"Set DETECTOR_BACKEND = \"{args.backend}\" and {setting} = \"{path}\" in src/config/config.py to use it.")
+    return 0
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    """
+    Runs several backends on the same frames and prints their speed and agreement.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    frames = read_sample_frames(args.video, args.frames, max(1, args.step))
+    if not frames:
+        raise ValueError(f"No frames could be read from {args.video}")
+    rows = compare_backends(frames, args.backends, batch_size=args.batch_size)
+    print(f"{len(frames)} frames, reference: {args.backends[0]}")
+    print(f"{'backend':<12} {'fps':>8} {'detections':>10} {'recall':>8} {'precision':>9} {'mean IoU':>8}")
+    for row in rows:
+        mean_iou = f"{row['mean_iou']:.3f}" if row['mean_iou'] is not None else "-"
+        print(
+            f"{row['backend']:<12} {row['fps'] or 0:>8.2f} {row['detections']:>10} "
+            f"{row['recall']:>8.3f} {row['precision']:>9.3f} {mean_iou:>8}"
+        )
+    return 0
+
+
+def benchmark_command(args: argparse.Namespace) -> int:
+    """
+    Benchmarks the pipeline stages and prints the median latency of each.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    report = run_benchmarks(
+        args.resolutions, args.frames, args.densities, args.work_dir,
+        detector=args.detector,
+        scale_percent=args.scale,
+        seed=args.seed
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"{'scenario':<24}" + "".join(f"{stage + ' p50':>13}" for stage in STAGES) + f"{'pipeline fps':>14}{'peak MiB':>10}")
+    for scenario in report["scenarios"]:
+        medians = "".join(f"{scenario['stages'][stage]['p50_ms']:>11.2f}ms" for stage in STAGES)
+        print(f"{scenario['name']:<24}{medians}{scenario['pipeline_fps']:>14.2f}{scenario['peak_rss_mb'] or 0:>10.1f}")
+    if args.output:
+        print(f"Report saved at: {args.output}")
+    return 0
+
+
+def sweep_command(args: argparse.Namespace) -> int:
+    """
+    Evaluates a grid of tracker settings and ROI files and prints them ranked by error.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        int: Process exit code.
+    """
+    rows = run_sweep(
+        args.video,
+        args.rois,
+        load_ground_truth(args.ground_truth),
+        args.detection_cache,
+        args.threshold_centers,
+        args.frame_max,
+        args.patience,
+        camera=args.camera,
+        num_workers=args.workers,
+        backend=args.backend
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    print(f"{'rank':>4}  {'rois':<24} {'threshold':>9} {'frame max':>9} {'patience':>8} {'abs err':>7} {'rel err':>7} {'seconds':>8}  counts")
+    for rank, row in enumerate(rows[:args.top] if args.top else rows, start=1):
+        relative_error = f"{row['relative_error']:.3f}" if row['relative_error'] is not None else "-"
+        counts = ", ".join(f"{region}={count}" for region, count in row["roi_counts"].items())
+        print(
+            f"{rank:>4}  {os.path.basename(row['rois']):<24} {row['threshold_centers']:>9g} {row['frame_max']:>9} "
+            f"{row['patience']:>8} {row['abs_error']:>7} {relative_error:>7} {row['seconds']:>8.2f}  {counts}"
+        )
+    if args.output:
+        print(f"Results saved at: {args.output}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point for the headless command line interface.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # "run" is the default command so `main.py --headless video ...` keeps working
+    if argv and argv[0] not in COMMANDS and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "run")
+    args = build_parser().parse_args(argv)
+    return args.func(args)
\ No newline at end of file
@@ -9,9 +9,92 @@ FRAME_MAX = 10
 PATIENCE = 100
 ALPHA = 0.3
 VIDEO_CODEC = "MP4V"
+# Video decoding and encoding: "opencv" (cv2.VideoCapture/VideoWriter) or "ffmpeg" (frames piped to an ffmpeg process)
+VIDEO_IO_BACKEND = "opencv"
+# ffmpeg executable, used by the "ffmpeg" backend and to join video segments
+FFMPEG_PATH = "ffmpeg"
+# Encoder of the "ffmpeg" backend, e.g. "libx264", "libx265", or a hardware encoder such as "h264_nvenc"
+FFMPEG_CODEC = "libx264"
+# Constant quality of the encoder (lower is better); passed as -cq to NVENC and -global_quality to QSV encoders
+FFMPEG_CRF = 23
+# Encoder speed/size trade-off; hardware encoders use their own presets (e.g. "p4" for NVENC)
+FFMPEG_PRESET = "veryfast"
+# Encoder and decoder threads, 0 lets ffmpeg choose
+FFMPEG_THREADS = 0
+# Hardware decoding passed to -hwaccel (e.g. "cuda", "vaapi", "qsv"), None to decode in software
+FFMPEG_HWACCEL = None
+# Minimum number of preallocated frame buffers the ffmpeg reader cycles through
+FFMPEG_BUFFER_FRAMES = 4
+# When False the annotated video is not drawn or encoded; only counts and tracks are produced
+RENDER_OUTPUT = True
+
+# "roi" runs the detector on every ROI crop, "full_frame" runs it once per frame
+# and assigns detections to ROIs by point-in-polygon on their centers
+DETECTION_MODE = "roi"
+# Number of frames accumulated by the pipeline and images sent per model call
+BATCH_SIZE = 8
+# Capacity, in frames, of the queues between the decode, inference and encode threads
+QUEUE_SIZE = 16
+# Warm-up frames each segment shares with the previous one when a video is split across processes
+SHARD_OVERLAP_FRAMES = 50
+# Frames between two checkpoints of a resumable run; each one also closes an output video segment
+CHECKPOINT_INTERVAL = 5000
+# In "full_frame" mode, only the bounding rectangle of all ROIs is passed to the detector
+CROP_TO_ROI_UNION = True
+# Run the detector on every k-th frame only; tracks are extrapolated on the frames in between
+INFERENCE_STRIDE = 1
+# Skip inference for a detector input (ROI crop or full-frame image) that shows no motion
+MOTION_GATE = False
+# Fraction of motion-gate thumbnail pixels that must change for an input to count as moving
+MOTION_THRESHOLD = 0.005
+# Gray-level difference above which a thumbnail pixel counts as changed
+MOTION_PIXEL_DELTA = 25
+# Side, in pixels, of the grayscale thumbnails compared by the motion gate
+MOTION_GATE_SIZE = 64
+
+# Live sources: seconds without a new frame after which the stream is considered ended
+STREAM_READ_TIMEOUT = 5.0
+# Capacity of the queues between stages for live sources, kept small so latency stays bounded
+STREAM_QUEUE_SIZE = 2
+# Window, in seconds, of the rolling counts reported for live sources
+ROLLING_WINDOW_SECONDS = 60
+# Seconds between two live status lines
+STREAM_REPORT_INTERVAL = 5
+
+# Per-stage pipeline metrics; when disabled the instrumentation is a no-op
+METRICS_ENABLED = False
+# Seconds between two metrics reports (structured log line and Prometheus file)
+METRICS_INTERVAL = 10
+# Prometheus text file rewritten at each report, e.g. for the node_exporter textfile collector
+METRICS_FILE = None
+# Port of the Prometheus /metrics HTTP endpoint, None to disable it
+METRICS_PORT = None
+# Prefix of the exported metric names
+METRICS_PREFIX = "people_counter"
+
+# Columnar time series of detections, region events and counts: "parquet" (needs pyarrow), "npz", or
+# "auto" for Parquet when pyarrow is installed
+TIMESERIES_FORMAT = "auto"
+# Frames per time series part file
+TIMESERIES_CHUNK_FRAMES = 1000
+# Part files waiting for the writer thread before the pipeline blocks
+TIMESERIES_QUEUE_CHUNKS = 4
 
 YOLO_MODEL_PATH = "yolov8x.pt"
 YOLO_CLASSES_OF_INTEREST = [0]
+# Inference backend: "ultralytics" (PyTorch weights), "onnxruntime" or "openvino" (exported models)
+DETECTOR_BACKEND = "ultralytics"
+# Exported models, created with `python -m src export`; point to the *_int8 export for the quantised model
+ONNX_MODEL_PATH = "yolov8x.onnx"
+OPENVINO_MODEL_PATH = "yolov8x_openvino_model"
+# Input size of the exported models and NMS settings matching the ultralytics predictor
+MODEL_INPUT_SIZE = 640
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+# On-disk cache of detector outputs, replayed by later runs on the same video and model; None to disable
+DETECTION_CACHE_DIR = None
+# Size limit of the detection cache; the least recently used entries are evicted beyond it
+DETECTION_CACHE_MAX_MB = 2048
 
 GUI_TITLE = "People Counter with Computer Vision"
 GUI_WIDTH = 600
@@ -0,0 +1,340 @@
+"""
+Inference backends behind PedestrianDetector.
+
+Every backend turns a list of BGR images into one Detections object per image,
+so the rest of the pipeline does not depend on how the model is executed.
+"""
+
+import ast
+import glob
+import os
+from typing import Dict, List, Tuple
+import cv2
+import numpy as np
+from src.detection.detections import Detections
+from src.config.config import (
+    YOLO_MODEL_PATH, YOLO_CLASSES_OF_INTEREST, CONFIDENCE_LEVEL, NMS_IOU_THRESHOLD, MAX_DETECTIONS,
+    MODEL_INPUT_SIZE, ONNX_MODEL_PATH, OPENVINO_MODEL_PATH
+)
+
+BACKENDS = ("ultralytics", "onnxruntime", "openvino")
+
+# Model loaded by each backend
+MODEL_PATHS = {"ultralytics": YOLO_MODEL_PATH, "onnxruntime": ONNX_MODEL_PATH, "openvino": OPENVINO_MODEL_PATH}
+
+# Gray level ultralytics pads letterboxed images with
+_PAD_VALUE = 114
+
+
+class UltralyticsBackend:
+    """
+    Runs the PyTorch weights through ultralytics.
+    """
+    
+    def __init__(self, model_path: str = YOLO_MODEL_PATH):
+        """
+        Initializes the UltralyticsBackend.
+
+        Args:
+            model_path (str): Path to the YOLO weights.
+        """
+        from ultralytics import YOLO
+        
+        self.model_path = model_path
+        self.model = YOLO(model_path)
+        self.model.classes = YOLO_CLASSES_OF_INTEREST
+        self.names = self.model.model.names
+    
+    def predict_batch(self, frames: List[np.ndarray], batch_size: int) -> List[Detections]:
+        """
+        Detects objects on several images.
+
+        Args:
+            frames (list): Input images, possibly of different sizes.
+            batch_size (int): Maximum number of images sent to the model per call.
+
+        Returns:
+            list: One Detections object per image.
+        """
+        detections = []
+        for start in range(0, len(frames), batch_size):
+            results = self.model.predict(frames[start:start + batch_size], conf=CONFIDENCE_LEVEL, verbose=False)
+            detections.extend(self._to_detections(result) for result in results)
+        return detections
+    
+    def _to_detections(self, result) -> Detections:
+        """
+        Converts a single YOLO result into Detections.
+
+        Args:
+            result (ultralytics.engine.results.Results): Prediction for one image.
+
+        Returns:
+            Detections: Array-backed detection results.
+        """
+        boxes = result.boxes
+        if len(boxes) == 0:
+            return Detections.empty()
+        return Detections(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy())
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resizes an image into a square model input, keeping its aspect ratio.
+
+    Args:
+        image (numpy.ndarray): BGR image.
+        size (int): Side of the model input.
+
+    Returns:
+        tuple: (3, size, size) float32 RGB input in [0, 1], the resize scale and the
+            (x, y) padding added on the left and top.
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    pad_x, pad_y = (size - new_width) / 2, (size - new_height) / 2
+    left, top = round(pad_x - 0.1), round(pad_y - 0.1)
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    padded = np.full((size, size, 3), _PAD_VALUE, dtype=np.uint8)
+    padded[top:top + new_height, left:left + new_width] = image
+    blob = padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob, scale, (left, top)
+
+
+def decode_output(
+    output: np.ndarray,
+    image_shape: Tuple[int, int],
+    scale: float,
+    pad: Tuple[float, float]
+) -> Detections:
+    """
+    Converts the raw YOLOv8 output of one image into Detections in image coordinates.
+
+    Applies the confidence threshold and class-aware non-maximum suppression
+    with the same settings as the ultralytics predictor.
+
+    Args:
+        output (numpy.ndarray): (4 + num_classes, num_anchors) raw prediction.
+        image_shape (tuple): (height, width) of the original image.
+        scale (float): Resize scale applied by letterbox().
+        pad (tuple): (x, y) padding added by letterbox().
+
+    Returns:
+        Detections: Detections after NMS, by decreasing confidence.
+    """
+    predictions = output.T
+    scores = predictions[:, 4:]
+    cls = scores.argmax(axis=1)
+    conf = scores[np.arange(len(scores)), cls]
+    keep = conf > CONFIDENCE_LEVEL
+    if not keep.any():
+        return Detections.empty()
+    predictions, cls, conf = predictions[keep], cls[keep], conf[keep]
+    
+    xywh = predictions[:, :4].copy()
+    xywh[:, :2] -= xywh[:, 2:] / 2
+    indices = np.asarray(
+        cv2.dnn.NMSBoxesBatched(xywh.tolist(), conf.tolist(), cls.tolist(), CONFIDENCE_LEVEL, NMS_IOU_THRESHOLD),
+        dtype=np.int64
+    ).reshape(-1)
+    indices = indices[np.argsort(-conf[indices], kind='stable')][:MAX_DETECTIONS]
+    
+    xyxy = np.concatenate([xywh[indices, :2], xywh[indices, :2] + xywh[indices, 2:]], axis=1)
+    xyxy -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+    xyxy /= scale
+    height, width = image_shape
+    np.clip(xyxy, 0, [width, height, width, height], out=xyxy)
+    return Detections(xyxy, conf[indices], cls[indices])
+
+
+class ExportedModelBackend:
+    """
+    Base class of the backends running a YOLOv8 model exported by ultralytics.
+
+    Pre-processing (letterbox) and post-processing (NMS) are done here with
+    NumPy and OpenCV, so neither PyTorch nor ultralytics is needed at runtime.
+    Subclasses only run the network on a preprocessed batch.
+    """
+    
+    def __init__(self, input_size: int, max_batch: int, names: Dict[int, str]):
+        """
+        Initializes the ExportedModelBackend.
+
+        Args:
+            input_size (int): Side of the square model input.
+            max_batch (int): Largest batch the model accepts, 0 when unbounded.
+            names (dict): Class index -> class name.
+        """
+        self.input_size = input_size
+        self.max_batch = max_batch
+        self.names = names
+    
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Runs the network.
+
+        Args:
+            batch (numpy.ndarray): (B, 3, size, size) float32 input.
+
+        Returns:
+            numpy.ndarray: (B, 4 + num_classes, num_anchors) raw predictions.
+        """
+        raise NotImplementedError
+    
+    def predict_batch(self, frames: List[np.ndarray], batch_size: int) -> List[Detections]:
+        """
+        Detects objects on several images.
+
+        Args:
+            frames (list): Input images, possibly of different sizes.
+            batch_size (int): Maximum number of images sent to the model per call.
+
+        Returns:
+            list: One Detections object per image.
+        """
+        step = min(batch_size, self.max_batch) if self.max_batch else batch_size
+        detections = []
+        for start in range(0, len(frames), step):
+            chunk = frames[start:start + step]
+            inputs = [letterbox(frame, self.input_size) for frame in chunk]
+            outputs = self._run(np.stack([blob for blob, _, _ in inputs]))
+            detections.extend(
+                decode_output(output, frame.shape[:2], scale, pad)
+                for output, frame, (_, scale, pad) in zip(outputs, chunk, inputs)
+            )
+        return detections
+
+
+def _parse_names(names) -> Dict[int, str]:
+    """
+    Reads the class names stored in an exported model's metadata.
+
+    Args:
+        names: Dictionary, or its string representation.
+
+    Returns:
+        dict: Class index -> class name, empty when unavailable.
+    """
+    if isinstance(names, str):
+        names = ast.literal_eval(names)
+    return {int(idx): name for idx, name in (names or {}).items()}
+
+
+class OnnxRuntimeBackend(ExportedModelBackend):
+    """
+    Runs an ONNX export of the model on the CPU with ONNX Runtime.
+    """
+    
+    def __init__(self, model_path: str = ONNX_MODEL_PATH):
+        """
+        Initializes the OnnxRuntimeBackend.
+
+        Args:
+            model_path (str): Path to the .onnx model, plain or int8-quantised.
+        """
+        import onnxruntime
+        
+        self.model_path = model_path
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        super().__init__(
+            input_size=height if isinstance(height, int) else MODEL_INPUT_SIZE,
+            max_batch=batch if isinstance(batch, int) else 0,
+            names=_parse_names(metadata.get("names"))
+        )
+    
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(ExportedModelBackend):
+    """
+    Runs an OpenVINO export of the model on the CPU.
+    """
+    
+    def __init__(self, model_path: str = OPENVINO_MODEL_PATH):
+        """
+        Initializes the OpenVINOBackend.
+
+        Args:
+            model_path (str): OpenVINO export directory, or the .xml file inside it.
+        """
+        import openvino
+        
+        self.model_path = model_path
+        model_dir = model_path if os.path.isdir(model_path) else os.path.dirname(model_path)
+        xml_path = model_path if not os.path.isdir(model_path) else glob.glob(os.path.join(model_path, "*.xml"))[0]
+        core = openvino.Core()
+        model = core.read_model(xml_path)
+        self.compiled_model = core.compile_model(model, "CPU")
+        shape = model.input(0).get_partial_shape()
+        
+        names = {}
+        metadata_path = os.path.join(model_dir, "metadata.yaml")
+        if os.path.exists(metadata_path):
+            import yaml
+            
+            with open(metadata_path) as f:
+                names = (yaml.safe_load(f) or {}).get("names")
+        super().__init__(
+            input_size=shape[2].get_length() if shape[2].is_static else MODEL_INPUT_SIZE,
+            max_batch=shape[0].get_length() if shape[0].is_static else 0,
+            names=_parse_names(names)
+        )
+    
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled_model(batch)[self.compiled_model.output(0)]
+
+
+def create_backend(name: str):
+    """
+    Creates an inference backend by name.
+
+    Args:
+        name (str): One of BACKENDS.
+
+    Returns:
+        The backend, exposing predict_batch(frames, batch_size), names and model_path.
+    """
+    if name == "ultralytics":
+        return UltralyticsBackend()
+    if name == "onnxruntime":
+        return OnnxRuntimeBackend()
+    if name == "openvino":
+        return OpenVINOBackend()
+    raise ValueError(f"Unknown detector backend: {name}")
+
+
+def export_model(backend: str, int8: bool = False) -> str:
+    """
+    Exports the YOLO weights for an exported-model backend.
+
+    Args:
+        backend (str): "onnxruntime" or "openvino".
+        int8 (bool): Quantise the weights to int8. ONNX models are quantised
+            dynamically; OpenVINO uses ultralytics' calibrated quantisation.
+
+    Returns:
+        str: Path of the exported model, to set as ONNX_MODEL_PATH or OPENVINO_MODEL_PATH.
+    """
+    from ultralytics import YOLO
+    
+    model = YOLO(YOLO_MODEL_PATH)
+    if backend == "openvino":
+        return model.export(format="openvino", imgsz=MODEL_INPUT_SIZE, dynamic=True, int8=int8)
+    if backend != "onnxruntime":
+        raise ValueError(f"Backend {backend} does not use an exported model")
+    path = model.export(format="onnx", imgsz=MODEL_INPUT_SIZE, dynamic=True)
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        
+        base, ext = os.path.splitext(path)
+        quantized_path = f"{base}_int8{ext}"
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QUInt8)
+        path = quantized_path
+    return path
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+On-disk cache of detector outputs.
+
+Tracking and counting settings (THRESHOLD_CENTERS, FRAME_MAX, PATIENCE, ROI
+polygons) do not change what the detector sees, so the detections of a video can
+be computed once and replayed by every later run. An entry holds the detections of
+one video for one model and detection geometry, stored as columnar .npy files
+that are memory-mapped when read.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+import numpy as np
+from src.detection.detections import Detections
+from src.config.config import (
+    CONFIDENCE_LEVEL, NMS_IOU_THRESHOLD, MAX_DETECTIONS, MODEL_INPUT_SIZE, YOLO_CLASSES_OF_INTEREST,
+    DETECTION_CACHE_MAX_MB
+)
+
+# Number of evenly spaced blocks of the video file hashed to identify its content
+_HASH_BLOCKS = 16
+_HASH_BLOCK_SIZE = 1 << 16
+_META_FILE = "meta.json"
+_COLUMNS = ("xyxy", "conf", "cls")
+
+
+def hash_video(video_path: str) -> str:
+    """
+    Identifies a video file by its content.
+
+    Hashes the file size and evenly spaced blocks of the file instead of the whole
+    file, so long videos are identified in milliseconds.
+
+    Args:
+        video_path (str): Path to the video file.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    size = os.path.getsize(video_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(video_path, "rb") as f:
+        for block in range(_HASH_BLOCKS):
+            f.seek(max(0, size - _HASH_BLOCK_SIZE) * block // (_HASH_BLOCKS - 1))
+            digest.update(f.read(_HASH_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def describe_model(detector) -> Dict:
+    """
+    Describes the model and settings that determine a detector's output.
+
+    Args:
+        detector: PedestrianDetector, or any object with predict_batch().
+
+    Returns:
+        dict: JSON-serialisable description of the detector.
+    """
+    model_path = getattr(detector, "model_path", None)
+    return {
+        "backend": getattr(detector, "backend_name", type(detector).__name__),
+        "model": os.path.basename(os.path.normpath(model_path)) if model_path else None,
+        "model_size": os.path.getsize(model_path) if model_path and os.path.isfile(model_path) else None,
+        "confidence": CONFIDENCE_LEVEL,
+        "nms_iou": NMS_IOU_THRESHOLD,
+        "max_detections": MAX_DETECTIONS,
+        "input_size": MODEL_INPUT_SIZE,
+        "classes": YOLO_CLASSES_OF_INTEREST
+    }
+
+
+def _entry_size(path: str) -> int:
+    """
+    Computes the size on disk of a cache entry.
+
+    Args:
+        path (str): Entry directory.
+
+    Returns:
+        int: Total size of its files, in bytes.
+    """
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path) for name in names
+    )
+
+
+def evict_entries(root: str, max_bytes: int, keep: Optional[str] = None) -> List[str]:
+    """
+    Removes the least recently used cache entries until the cache fits its size limit.
+
+    Args:
+        root (str): Cache directory.
+        max_bytes (int): Size limit of the cache.
+        keep (str, optional): Entry directory that is never evicted, e.g. the one in use.
+
+    Returns:
+        list: Paths of the evicted entries.
+    """
+    entries = []
+    for name in os.listdir(root):
+        meta_path = os.path.join(root, name, _META_FILE)
+        if os.path.exists(meta_path):
+            entries.append((os.path.getmtime(meta_path), os.path.join(root, name)))
+    sizes = {path: _entry_size(path) for _, path in entries}
+    total = sum(sizes.values())
+    evicted = []
+    for _, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.samefile(path, keep):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= sizes[path]
+        evicted.append(path)
+    return evicted
+
+
+class DetectionCache:
+    """
+    Detections of one video for one detector and detection geometry.
+
+    Results are addressed by (frame index, detector input), where the inputs are
+    the ROI crops or the full-frame image of a frame. Each run that computes new
+    detections adds them as a new chunk directory, so several processes can fill
+    the same entry concurrently; lookups merge the chunks through a sorted index.
+    """
+    
+    def __init__(self, root: str, key: Dict, num_inputs: int, max_bytes: int = DETECTION_CACHE_MAX_MB * 1024 * 1024):
+        """
+        Initializes the DetectionCache and loads the existing entry, if any.
+
+        Args:
+            root (str): Cache directory, shared by all entries.
+            key (dict): JSON-serialisable description of everything the detections
+                depend on: video content, model, thresholds and input geometry.
+            num_inputs (int): Number of detector inputs per frame.
+            max_bytes (int): Size limit of the whole cache directory.
+        """
+        self.root = root
+        self.key = key
+        self.num_inputs = num_inputs
+        self.max_bytes = max_bytes
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        self.path = os.path.join(root, digest[:24])
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[tuple] = []
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, _META_FILE)
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as f:
+                json.dump(key, f, indent=2)
+        # The modification time of the metadata marks the last use, for eviction
+        os.utime(meta_path)
+        self._load()
+    
+    def _load(self):
+        """
+        Memory-maps the chunks of the entry and merges their indexes.
+        """
+        self._chunks = []
+        slots, rows = [], []
+        for name in sorted(os.listdir(self.path)):
+            if not name.startswith("chunk-"):
+                continue
+            chunk_path = os.path.join(self.path, name)
+            index = np.load(os.path.join(chunk_path, "index.npy"))
+            self._chunks.append({
+                column: np.load(os.path.join(chunk_path, f"{column}.npy"), mmap_mode="r") for column in _COLUMNS
+            })
+            slots.append(index[:, 0])
+            rows.append(np.column_stack([np.full(len(index), len(self._chunks) - 1), index[:, 1:]]))
+        if not slots:
+            self._slots = np.empty(0, dtype=np.int64)
+            self._rows = np.empty((0, 3), dtype=np.int64)
+            return
+        slots = np.concatenate(slots)
+        rows = np.concatenate(rows)
+        # Keep the oldest copy of slots detected by several runs
+        self._slots, first = np.unique(slots, return_index=True)
+        self._rows = rows[first]
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def _find(self, slots: np.ndarray) -> np.ndarray:
+        """
+        Looks up slots in the merged index.
+
+        Args:
+            slots (numpy.ndarray): Slots, frame_idx * num_inputs + input_idx.
+
+        Returns:
+            numpy.ndarray: Position of each slot in the index, -1 when missing.
+        """
+        positions = np.searchsorted(self._slots, slots)
+        found = positions < len(self._slots)
+        found[found] = self._slots[positions[found]] == slots[found]
+        return np.where(found, positions, -1)
+    
+    def get(self, frame_idx: int, input_idx: int) -> Optional[Detections]:
+        """
+        Returns the cached detections of a detector input.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            input_idx (int): Index of the detector input in the frame.
+
+        Returns:
+            Detections: The cached detections, None on a cache miss.
+        """
+        position = self._find(np.array([frame_idx * self.num_inputs + input_idx]))[0]
+        if position < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        chunk, start, count = self._rows[position].tolist()
+        columns = self._chunks[chunk]
+        return Detections(*(columns[column][start:start + count] for column in _COLUMNS))
+    
+    def contains(self, frame_indices: np.ndarray) -> bool:
+        """
+        Checks whether every input of the given frames is cached.
+
+        Args:
+            frame_indices (numpy.ndarray): Frame indices.
+
+        Returns:
+            bool: True when all of them are cached.
+        """
+        frame_indices = np.asarray(frame_indices, dtype=np.int64)
+        slots = (frame_indices[:, None] * self.num_inputs + np.arange(self.num_inputs)).reshape(-1)
+        return bool((self._find(slots) >= 0).all())
+    
+    def put(self, frame_idx: int, input_idx: int, detections: Detections):
+        """
+        Adds the detections of a detector input; they are written by flush().
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            input_idx (int): Index of the detector input in the frame.
+            detections (Detections): Detector output for the input.
+        """
+        self._pending.append((frame_idx * self.num_inputs + input_idx, detections))
+    
+    def flush(self):
+        """
+        Writes the pending detections as a new chunk and evicts old entries beyond
+        the size limit.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        counts = np.array([len(detections) for _, detections in pending], dtype=np.int64)
+        index = np.column_stack([
+            np.array([slot for slot, _ in pending], dtype=np.int64),
+            np.cumsum(counts) - counts,
+            counts
+        ])
+        merged = Detections.concatenate([detections for _, detections in pending])
+        # Chunks are written under a hidden name and renamed once complete
+        temp_path = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(temp_path)
+        np.save(os.path.join(temp_path, "index.npy"), index)
+        for column in _COLUMNS:
+            np.save(os.path.join(temp_path, f"{column}.npy"), getattr(merged, column))
+        os.rename(temp_path, os.path.join(self.path, f"chunk-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"))
+        self._load()
+        evict_entries(self.root, self.max_bytes, keep=self.path)
\ No newline at end of file
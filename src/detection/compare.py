@@ -0,0 +1,133 @@
+"""
+Accuracy and speed comparison of the inference backends on the same frames.
+"""
+
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from src.detection.detections import Detections
+from src.detection.detector import PedestrianDetector
+from src.video.video_processor import VideoProcessor
+from src.utils.utils import resize_frame
+from src.config.config import VIDEO_SCALE_PERCENT, BATCH_SIZE
+
+# Minimum IoU for a detection to match a reference detection
+MATCH_IOU = 0.5
+
+
+def read_sample_frames(video_path: str, num_frames: int, step: int = 1) -> List[np.ndarray]:
+    """
+    Decodes the frames the backends are compared on.
+
+    Args:
+        video_path (str): Path to the input video file.
+        num_frames (int): Maximum number of frames to read.
+        step (int): Keep one frame out of `step`.
+
+    Returns:
+        list: Frames at the processing scale.
+    """
+    video_processor = VideoProcessor(video_path)
+    frames = []
+    frame_idx = 0
+    while len(frames) < num_frames:
+        is_frame, frame = video_processor.get_frame()
+        if not is_frame:
+            break
+        if frame_idx % step == 0:
+            # Copied since the ffmpeg reader reuses its decode buffers
+            frames.append(resize_frame(frame, VIDEO_SCALE_PERCENT) if VIDEO_SCALE_PERCENT != 100 else frame.copy())
+        frame_idx += 1
+    video_processor.release()
+    return frames
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Computes the pairwise IoU of two sets of boxes.
+
+    Args:
+        boxes_a (numpy.ndarray): (N, 4) xyxy boxes.
+        boxes_b (numpy.ndarray): (M, 4) xyxy boxes.
+
+    Returns:
+        numpy.ndarray: (N, M) IoU matrix.
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def match_detections(reference: Detections, candidate: Detections) -> Tuple[int, float]:
+    """
+    Greedily matches candidate detections to reference detections of the same class.
+
+    Args:
+        reference (Detections): Detections of the reference backend.
+        candidate (Detections): Detections of the compared backend.
+
+    Returns:
+        tuple: Number of matched pairs and the sum of their IoU.
+    """
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0, 0.0
+    iou = box_iou(reference.xyxy, candidate.xyxy)
+    iou[reference.cls[:, None] != candidate.cls[None, :]] = 0
+    ref_idx, cand_idx = np.nonzero(iou >= MATCH_IOU)
+    order = np.argsort(-iou[ref_idx, cand_idx], kind='stable')
+    used_ref, used_cand = set(), set()
+    iou_sum = 0.0
+    for r, c in zip(ref_idx[order].tolist(), cand_idx[order].tolist()):
+        if r not in used_ref and c not in used_cand:
+            used_ref.add(r)
+            used_cand.add(c)
+            iou_sum += float(iou[r, c])
+    return len(used_ref), iou_sum
+
+
+def compare_backends(frames: List[np.ndarray], backends: List[str], batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """
+    Runs every backend on the same frames and compares them to the first one.
+
+    Args:
+        frames (list): Frames to detect on.
+        backends (list): Backend names; the first one is the reference.
+        batch_size (int): Images per inference call.
+
+    Returns:
+        list: One row per backend with its throughput and its recall, precision and
+            mean IoU against the reference detections.
+    """
+    rows = []
+    reference = None
+    for backend in backends:
+        detector = PedestrianDetector(backend=backend)
+        # Warm-up call so lazy initialisation is not timed
+        detector.predict_batch(frames[:1], batch_size=batch_size)
+        started = time.perf_counter()
+        detections = detector.predict_batch(frames, batch_size=batch_size)
+        seconds = time.perf_counter() - started
+        if reference is None:
+            reference = detections
+        
+        num_reference = sum(len(d) for d in reference)
+        num_detections = sum(len(d) for d in detections)
+        matched, iou_sum = 0, 0.0
+        for ref, cand in zip(reference, detections):
+            frame_matched, frame_iou = match_detections(ref, cand)
+            matched += frame_matched
+            iou_sum += frame_iou
+        rows.append({
+            "backend": backend,
+            "seconds": round(seconds, 3),
+            "fps": round(len(frames) / seconds, 2) if seconds > 0 else None,
+            "detections": num_detections,
+            "recall": round(matched / num_reference, 4) if num_reference else 1.0,
+            "precision": round(matched / num_detections, 4) if num_detections else 1.0,
+            "mean_iou": round(iou_sum / matched, 4) if matched else None
+        })
+    return rows
\ No newline at end of file
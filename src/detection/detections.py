@@ -0,0 +1,117 @@
+import numpy as np
+
+class Detections:
+    """
+    Array-backed detection results for a single image.
+
+    Boxes, confidences and classes are kept in contiguous NumPy arrays so
+    downstream tracking and drawing can work on all detections at once.
+    """
+    
+    __slots__ = ("xyxy", "conf", "cls")
+    
+    COLUMNS = ['xmin', 'ymin', 'xmax', 'ymax', 'conf', 'class']
+    
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        """
+        Initializes the Detections from box, confidence and class arrays.
+
+        Args:
+            xyxy (numpy.ndarray): Boxes as (N, 4) array of xmin, ymin, xmax, ymax.
+            conf (numpy.ndarray): Confidence of each box, shape (N,).
+            cls (numpy.ndarray): Class index of each box, shape (N,).
+        """
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.ascontiguousarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.ascontiguousarray(cls, dtype=np.int32).reshape(-1)
+    
+    @classmethod
+    def empty(cls) -> "Detections":
+        """
+        Creates an empty Detections object.
+
+        Returns:
+            Detections: Detections without any box.
+        """
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0))
+    
+    @classmethod
+    def concatenate(cls, detections_list: list) -> "Detections":
+        """
+        Joins several Detections into one.
+
+        Args:
+            detections_list (list): Detections objects to join.
+
+        Returns:
+            Detections: All detections, in order.
+        """
+        if not detections_list:
+            return cls.empty()
+        if len(detections_list) == 1:
+            return detections_list[0]
+        return cls(
+            np.concatenate([d.xyxy for d in detections_list]),
+            np.concatenate([d.conf for d in detections_list]),
+            np.concatenate([d.cls for d in detections_list])
+        )
+    
+    def __len__(self) -> int:
+        return len(self.conf)
+    
+    def __getitem__(self, index) -> "Detections":
+        """
+        Selects a subset of detections.
+
+        Args:
+            index: Boolean mask, integer array or slice over the detections.
+
+        Returns:
+            Detections: The selected detections.
+        """
+        return Detections(self.xyxy[index], self.conf[index], self.cls[index])
+    
+    @property
+    def boxes(self) -> np.ndarray:
+        """
+        Integer pixel boxes, shape (N, 4).
+        """
+        return self.xyxy.astype(np.int32)
+    
+    @property
+    def centers(self) -> np.ndarray:
+        """
+        Integer box centers as an (N, 2) array of (x, y).
+        """
+        boxes = self.boxes
+        return np.stack([(boxes[:, 0] + boxes[:, 2]) // 2, (boxes[:, 1] + boxes[:, 3]) // 2], axis=1)
+    
+    def offset(self, dx, dy) -> "Detections":
+        """
+        Shifts the boxes, e.g. from crop coordinates to frame coordinates.
+
+        Args:
+            dx (float or numpy.ndarray): Horizontal shift in pixels, for all boxes or per box.
+            dy (float or numpy.ndarray): Vertical shift in pixels, for all boxes or per box.
+
+        Returns:
+            Detections: The shifted detections.
+        """
+        shift = np.stack(np.broadcast_arrays(dx, dy, dx, dy), axis=-1).astype(np.float32)
+        if not shift.any():
+            return self
+        return Detections(self.xyxy + shift, self.conf, self.cls)
+    
+    def to_dataframe(self):
+        """
+        Converts the detections to the legacy DataFrame format.
+
+        Returns:
+            pandas.DataFrame: DataFrame with xmin, ymin, xmax, ymax, conf and class columns.
+        """
+        import pandas as pd
+        
+        return pd.DataFrame(
+            np.concatenate([self.xyxy, self.conf.reshape(-1, 1), self.cls.reshape(-1, 1)], axis=1),
+            columns=self.COLUMNS
+        )
\ No newline at end of file
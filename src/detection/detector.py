@@ -1,22 +1,30 @@
-from ultralytics import YOLO
 import numpy as np
-import pandas as pd
-from src.config.config import YOLO_MODEL_PATH, CONFIDENCE_LEVEL, YOLO_CLASSES_OF_INTEREST
+from typing import List
+from src.detection.detections import Detections
+from src.detection.backends import create_backend
+from src.config.config import DETECTOR_BACKEND, BATCH_SIZE
 
 class PedestrianDetector:
     """
     Detects pedestrians in video frames using the YOLO model.
+
+    The model runs through the inference backend chosen in the configuration
+    (ultralytics, ONNX Runtime or OpenVINO); all of them return Detections.
     """
     
-    def __init__(self):
+    def __init__(self, backend: str = DETECTOR_BACKEND):
         """
         Initializes the PedestrianDetector with the YOLO model.
+
+        Args:
+            backend (str): Name of the inference backend, see src.detection.backends.
         """
-        self.model = YOLO(YOLO_MODEL_PATH)
-        self.model.classes = YOLO_CLASSES_OF_INTEREST
-        self.classes = self.model.model.names
+        self.backend_name = backend
+        self.backend = create_backend(backend)
+        self.model_path = self.backend.model_path
+        self.classes = self.backend.names
     
-    def predict(self, frame: np.ndarray) -> pd.DataFrame:
+    def predict(self, frame: np.ndarray) -> Detections:
         """
         Performs pedestrian detection on the given frame.
 
@@ -24,21 +32,23 @@ class PedestrianDetector:
             frame (numpy.ndarray): The input video frame.
 
         Returns:
-            pandas.DataFrame: DataFrame containing detection results.
-        """
-        results = self.model.predict(frame, conf=CONFIDENCE_LEVEL, verbose=False)
-        boxes = results[0].boxes.xyxy.cpu().numpy()
-        conf = results[0].boxes.conf.cpu().numpy()
-        classes = results[0].boxes.cls.cpu().numpy()
-        
-        if len(boxes) == 0:
-            return pd.DataFrame(columns=['xmin', 'ymin', 'xmax', 'ymax', 'conf', 'class'])
-        
-        df = pd.DataFrame(
-            np.concatenate([boxes, conf.reshape(-1, 1), classes.reshape(-1, 1)], axis=1),
-            columns=['xmin', 'ymin', 'xmax', 'ymax', 'conf', 'class']
-        )
-        return df
+            Detections: Array-backed detection results.
+        """
+        return self.predict_batch([frame])[0]
+    
+    def predict_batch(self, frames: List[np.ndarray], batch_size: int = BATCH_SIZE) -> List[Detections]:
+        """
+        Performs pedestrian detection on several frames, batching them into as few
+        model calls as possible.
+
+        Args:
+            frames (list): Input video frames or crops, possibly of different sizes.
+            batch_size (int): Maximum number of images sent to the model per call.
+
+        Returns:
+            list: One Detections object per input frame.
+        """
+        return self.backend.predict_batch(frames, batch_size)
     
     def get_labels(self, classes: np.ndarray) -> list:
         """
@@ -50,4 +60,4 @@ class PedestrianDetector:
         Returns:
             list: List of class labels.
         """
-        return [self.classes[int(cls)] for cls in classes]
\ No newline at end of file
+        return [self.classes.get(int(cls), str(int(cls))) for cls in classes]
\ No newline at end of file
@@ -2,19 +2,9 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from src.video.video_processor import VideoProcessor
 from src.roi.roi_manager import ROIManager
-from src.detection.detector import PedestrianDetector
-from src.tracking.tracker import Tracker
-from src.utils.utils import resize_frame
-from src.config.config import (
-    GUI_TITLE, GUI_WIDTH, GUI_HEIGHT,
-    VIDEO_SCALE_PERCENT, CONFIDENCE_LEVEL,
-    THRESHOLD_CENTERS, FRAME_MAX, PATIENCE, ALPHA
-)
-import os
-from tqdm import tqdm
-import cv2
-import numpy as np
-import pandas as pd
+from src.pipeline.pipeline import Pipeline
+from src.config.config import GUI_TITLE, GUI_WIDTH, GUI_HEIGHT
+import threading
 
 class PedestrianDetectionApp:
     """
@@ -30,6 +20,9 @@ class PedestrianDetectionApp:
         """
         self.root = root
         self.root.title(GUI_TITLE)
+        self.detection_thread = None
+        self.detection_result = None
+        self.detection_error = None
         
         # Video Path
         tk.Label(root, text="Video Path:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.E)
@@ -111,103 +104,66 @@ class PedestrianDetectionApp:
             messagebox.showerror("Error", "Number of regions entered does not match the specified number.")
             return
         
+        if self.detection_thread is not None and self.detection_thread.is_alive():
+            messagebox.showerror("Error", "A detection is already in progress.")
+            return
+        
         try:
             self.result_text.config(state=tk.NORMAL)
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, "Detection in progress...\n")
             self.result_text.config(state=tk.DISABLED)
             
-            # Initialize components
+            # ROI selection opens OpenCV windows and must stay on the main thread
             video_processor = VideoProcessor(video_path)
-            roi_manager = ROIManager(video_path, regions)
+            roi_manager = ROIManager(video_path, regions, frame=video_processor.read_preview_frame())
             rois = roi_manager.select_rois()
-            detector = PedestrianDetector()
-            tracker = Tracker(
-                threshold_centers=THRESHOLD_CENTERS,
-                frame_max=FRAME_MAX,
-                patience=PATIENCE
-            )
-            output_video_path = os.path.join(
-                target_dir,
-                f"Annotated_{os.path.basename(video_path).split('.')[0]}.mp4"
-            )
-            video_writer = video_processor.get_video_writer(output_video_path)
-            roi_counts = {roi['name']: 0 for roi in rois}
-            
-            for frame_idx in tqdm(range(video_processor.frame_count), desc="Processing Frames"):
-                is_frame, frame = video_processor.get_frame()
-                if not is_frame:
-                    break
-                
-                # Resize frame if necessary
-                if VIDEO_SCALE_PERCENT != 100:
-                    frame = resize_frame(frame, VIDEO_SCALE_PERCENT)
-                
-                for roi in rois:
-                    x_range, y_range = roi['range']
-                    roi_frame = frame[y_range[0]:y_range[1], x_range[0]:x_range[1]]
-                    detections = detector.predict(roi_frame)
-                    labels = detector.get_labels(detections['class'].values)
-                    
-                    for _, detection in detections.iterrows():
-                        xmin, ymin, xmax, ymax, conf, cls = detection.astype(int)
-                        center_x, center_y = (xmin + xmax) // 2, (ymin + ymax) // 2
-                        tracker.centers_old, obj_id, is_new, tracker.last_key = tracker.update_tracking(
-                            obj_center=(center_x, center_y),
-                            current_frame=frame_idx
-                        )
-                        if is_new:
-                            roi_counts[roi['name']] += 1
-                        cv2.rectangle(roi_frame, (xmin, ymin), (xmax, ymax), (0, 0, 255), 2)
-                        cv2.circle(roi_frame, (center_x, center_y), 5, (0, 0, 255), -1)
-                        cv2.putText(
-                            roi_frame,
-                            f"{obj_id}: {conf:.2f}",
-                            (xmin, ymin - 10),
-                            cv2.FONT_HERSHEY_TRIPLEX,
-                            0.8,
-                            (0, 0, 255),
-                            1
-                        )
-                
-                # Update tracking
-                tracker.centers_old = tracker.filter_tracks()
-                
-                # Overlay ROI polygons
-                overlay = frame.copy()
-                for roi in rois:
-                    pts = np.array(roi['polygon'], dtype=np.int32)
-                    cv2.polylines(overlay, [pts], isClosed=True, color=(255, 0, 0), thickness=2)
-                    cv2.fillPoly(overlay, [pts], (255, 0, 0))
-                frame = cv2.addWeighted(overlay, ALPHA, frame, 1 - ALPHA, 0)
-                
-                # Display counts
-                y_coordinate = 40
-                for region, count in roi_counts.items():
-                    cv2.putText(
-                        frame,
-                        f'People in {region}: {count}',
-                        (30, y_coordinate),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        1,
-                        (255, 0, 0),
-                        1
-                    )
-                    y_coordinate += 50
-                
-                # Write annotated frame to output video
-                video_writer.write(frame)
-            
-            video_processor.release()
-            video_writer.release()
-            
-            # Display results
-            self.result_text.config(state=tk.NORMAL)
-            self.result_text.insert(tk.END, "Detection completed.\nResults:\n")
-            for region, count in roi_counts.items():
-                self.result_text.insert(tk.END, f"People in {region}: {count}\n")
-            self.result_text.insert(tk.END, f"\nAnnotated video saved at: {output_video_path}")
-            self.result_text.config(state=tk.DISABLED)
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred during detection: {str(e)}")
+            return
         
+        self.detection_result = None
+        self.detection_error = None
+        self.detection_thread = threading.Thread(
+            target=self._run_pipeline,
+            args=(video_processor, rois, target_dir),
+            daemon=True
+        )
+        self.detection_thread.start()
+        self.root.after(200, self._poll_detection)
+    
+    def _run_pipeline(self, video_processor, rois, target_dir):
+        """
+        Runs the detection pipeline in a worker thread so the GUI stays responsive.
+
+        Args:
+            video_processor (VideoProcessor): Opened input video.
+            rois (list): List of ROI dictionaries.
+            target_dir (str): Directory where the annotated video is written.
+        """
+        try:
+            pipeline = Pipeline(video_processor, rois, target_dir)
+            roi_counts = pipeline.run()
+            self.detection_result = (roi_counts, pipeline.output_video_path)
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during detection: {str(e)}")
\ No newline at end of file
+            self.detection_error = e
+    
+    def _poll_detection(self):
+        """
+        Checks whether the worker thread has finished and displays its results.
+        """
+        if self.detection_thread.is_alive():
+            self.root.after(200, self._poll_detection)
+            return
+        
+        if self.detection_error is not None:
+            messagebox.showerror("Error", f"An error occurred during detection: {str(self.detection_error)}")
+            return
+        
+        roi_counts, output_video_path = self.detection_result
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.insert(tk.END, "Detection completed.\nResults:\n")
+        for region, count in roi_counts.items():
+            self.result_text.insert(tk.END, f"People in {region}: {count}\n")
+        self.result_text.insert(tk.END, f"\nAnnotated video saved at: {output_video_path}")
+        self.result_text.config(state=tk.DISABLED)
\ No newline at end of file
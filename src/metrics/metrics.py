@@ -0,0 +1,313 @@
+"""
+Lightweight in-process metrics for the pipeline stages.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from src.config.config import METRICS_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_key(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+class _Timer:
+    """
+    Context manager adding the time spent in a block to a stage's timer.
+    """
+    
+    __slots__ = ("metrics", "stage", "started")
+    
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    """
+    Timer of the disabled metrics; does nothing.
+    """
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Thread-safe counters, gauges and per-stage timers.
+
+    Counters (names ending in _total) only increase; gauges hold the last value
+    set, or are sampled from a callable when a snapshot is taken. Stage timers
+    accumulate the seconds and calls of each stage.
+    """
+    
+    enabled = True
+    
+    def __init__(self, prefix: str = METRICS_PREFIX):
+        """
+        Initializes the Metrics.
+
+        Args:
+            prefix (str): Prefix of every exported metric name.
+        """
+        self.prefix = prefix
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[tuple, float] = {}
+        self._gauges: Dict[tuple, float] = {}
+        self._gauge_functions: Dict[tuple, Callable[[], float]] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """
+        Increases a counter.
+
+        Args:
+            name (str): Counter name, ending in _total.
+            value (float): Amount to add.
+            **labels: Label values of the series.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def set(self, name: str, value: float, **labels: str):
+        """
+        Sets a gauge.
+
+        Args:
+            name (str): Gauge name.
+            value (float): Current value.
+            **labels: Label values of the series.
+        """
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+    
+    def gauge_function(self, name: str, function: Callable[[], float], **labels: str):
+        """
+        Registers a gauge sampled when a snapshot is taken, e.g. a queue depth.
+
+        Args:
+            name (str): Gauge name.
+            function (callable): Returns the current value.
+            **labels: Label values of the series.
+        """
+        with self._lock:
+            self._gauge_functions[_key(name, labels)] = function
+    
+    def observe(self, stage: str, seconds: float):
+        """
+        Records one call of a stage.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Time spent in the call.
+        """
+        labels = (("stage", stage),)
+        with self._lock:
+            seconds_key, calls_key = ("stage_seconds_total", labels), ("stage_calls_total", labels)
+            self._counters[seconds_key] = self._counters.get(seconds_key, 0) + seconds
+            self._counters[calls_key] = self._counters.get(calls_key, 0) + 1
+    
+    def timer(self, stage: str) -> _Timer:
+        """
+        Times a block: `with metrics.timer("decode"): ...`.
+
+        Args:
+            stage (str): Stage name.
+
+        Returns:
+            Context manager recording the block's duration.
+        """
+        return _Timer(self, stage)
+    
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the current value of every series.
+
+        Returns:
+            dict: Series name, with labels in Prometheus notation, -> value.
+        """
+        with self._lock:
+            values = dict(self._counters)
+            values.update(self._gauges)
+            functions = list(self._gauge_functions.items())
+        for key, function in functions:
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        values[("uptime_seconds", ())] = time.time() - self.started
+        return {_format_key(name, labels): value for (name, labels), value in sorted(values.items())}
+    
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: One TYPE line per metric followed by its series.
+        """
+        lines = []
+        typed = set()
+        for series, value in self.snapshot().items():
+            name = series.split("{", 1)[0]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {self.prefix}_{name} {'counter' if name.endswith('_total') else 'gauge'}")
+            lines.append(f"{self.prefix}_{series} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics:
+    """
+    Disabled metrics: every call is a no-op, so instrumented code stays cheap.
+    """
+    
+    enabled = False
+    
+    def inc(self, name: str, value: float = 1, **labels: str):
+        pass
+    
+    def set(self, name: str, value: float, **labels: str):
+        pass
+    
+    def gauge_function(self, name: str, function: Callable[[], float], **labels: str):
+        pass
+    
+    def observe(self, stage: str, seconds: float):
+        pass
+    
+    def timer(self, stage: str) -> _NullTimer:
+        return _NULL_TIMER
+    
+    def snapshot(self) -> Dict[str, float]:
+        return {}
+    
+    def to_prometheus(self) -> str:
+        return ""
+
+
+NULL_METRICS = NullMetrics()
+
+
+class MetricsReporter:
+    """
+    Publishes a Metrics object periodically while a job runs.
+
+    Every `interval` seconds a structured (JSON) log line is emitted and the
+    Prometheus text file, if any, is rewritten. An HTTP endpoint serving
+    /metrics can be started as well.
+    """
+    
+    def __init__(
+        self,
+        metrics: Metrics,
+        interval: float,
+        path: Optional[str] = None,
+        port: Optional[int] = None
+    ):
+        """
+        Initializes the MetricsReporter.
+
+        Args:
+            metrics (Metrics): Metrics to publish.
+            interval (float): Seconds between two reports.
+            path (str, optional): Prometheus text file to rewrite at each report.
+            port (int, optional): Port of the /metrics HTTP endpoint.
+        """
+        self.metrics = metrics
+        self.interval = interval
+        self.path = path
+        self.port = port
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    def report(self):
+        """
+        Logs one structured metrics line and rewrites the Prometheus file.
+        """
+        logger.info(json.dumps({"event": "metrics", "metrics": self.metrics.snapshot()}))
+        if self.path:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(self.metrics.to_prometheus())
+            os.replace(temp_path, self.path)
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.report()
+    
+    def start(self):
+        """
+        Starts the periodic reports and the HTTP endpoint.
+        """
+        if self.port is not None:
+            metrics = self.metrics
+            
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?", 1)[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = metrics.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                
+                def log_message(self, *args):
+                    pass
+            
+            self._server = ThreadingHTTPServer(("", self.port), Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Stops the reports after publishing the final values.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.report()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import json
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.config import ROLLING_WINDOW_SECONDS, STREAM_REPORT_INTERVAL
+
+class RollingCounts:
+    """
+    Counts the people who entered each region during the last `window_seconds`.
+
+    Register it with Pipeline.add_result_listener(); it keeps one small entry per
+    frame in which someone new was counted.
+    """
+    
+    def __init__(self, roi_names: List[str], window_seconds: float = ROLLING_WINDOW_SECONDS):
+        """
+        Initializes the RollingCounts.
+
+        Args:
+            roi_names (list): Region names, in ROI order.
+            window_seconds (float): Length of the rolling window.
+        """
+        self.roi_names = roi_names
+        self.window_seconds = window_seconds
+        self._events: Deque[Tuple[float, np.ndarray]] = deque()
+    
+    def __call__(self, result):
+        """
+        Records the people first counted in a frame.
+
+        Args:
+            result (FrameResult): Analysis result of the frame.
+        """
+        if result.is_new.any():
+            self._events.append((time.monotonic(), result.roi_mask[:, result.is_new].sum(axis=1)))
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the per-region counts of the current window.
+
+        Returns:
+            dict: Number of people counted per region within the window.
+        """
+        horizon = time.monotonic() - self.window_seconds
+        while self._events and self._events[0][0] < horizon:
+            self._events.popleft()
+        totals = np.zeros(len(self.roi_names), dtype=np.int64)
+        for _, new_per_roi in self._events:
+            totals += new_per_roi
+        return dict(zip(self.roi_names, totals.tolist()))
+
+
+class LiveReporter:
+    """
+    Emits a status line for a live source every `interval` seconds: achieved
+    versus source frame rate, dropped frames, rolling and total counts.
+
+    Register it with Pipeline.add_result_listener() after the RollingCounts it reads.
+    """
+    
+    def __init__(
+        self,
+        source,
+        rolling_counts: RollingCounts,
+        interval: float = STREAM_REPORT_INTERVAL,
+        path: Optional[str] = None
+    ):
+        """
+        Initializes the LiveReporter.
+
+        Args:
+            source (LiveSource): The live source, for its rate statistics.
+            rolling_counts (RollingCounts): Rolling counts to report.
+            interval (float): Seconds between two status lines.
+            path (str, optional): JSON Lines file the status lines are appended to.
+        """
+        self.source = source
+        self.rolling_counts = rolling_counts
+        self.interval = interval
+        self.path = path
+        self._next_report = time.monotonic() + interval
+        self._last_result = None
+    
+    def __call__(self, result):
+        """
+        Emits a status line when the interval has elapsed.
+
+        Args:
+            result (FrameResult): Analysis result of the latest frame.
+        """
+        self._last_result = result
+        if time.monotonic() >= self._next_report:
+            self._next_report += self.interval
+            self.report()
+    
+    def report(self) -> Dict:
+        """
+        Prints, and optionally appends to the log file, the current status.
+
+        Returns:
+            dict: The status line.
+        """
+        status = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "frame": self._last_result.frame_idx if self._last_result is not None else None,
+            **self.source.stats(),
+            "window_seconds": self.rolling_counts.window_seconds,
+            "rolling_counts": self.rolling_counts.counts(),
+            "total_counts": dict(self._last_result.roi_counts) if self._last_result is not None else {}
+        }
+        line = json.dumps(status)
+        print(line, flush=True)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+        return status
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+from typing import Dict, List, Optional
+
+class TrackSummary:
+    """
+    Collects a compact per-track summary from the pipeline's frame results.
+
+    Register it with Pipeline.add_result_listener(); it keeps one small record
+    per track (first/last frame and visited regions), not the position history.
+    """
+    
+    def __init__(self, roi_names: List[str]):
+        """
+        Initializes the TrackSummary.
+
+        Args:
+            roi_names (list): Region names, in ROI order.
+        """
+        self.roi_names = roi_names
+        self.tracks: Dict[int, Dict] = {}
+    
+    def __call__(self, result):
+        """
+        Records the tracked detections of one frame.
+
+        Args:
+            result (FrameResult): Analysis result of the frame.
+        """
+        memberships = result.roi_mask.T.tolist()
+        for track_id, member in zip(result.track_ids.tolist(), memberships):
+            track = self.tracks.get(track_id)
+            if track is None:
+                track = self.tracks[track_id] = {
+                    "id": f"ID{track_id}",
+                    "first_frame": result.frame_idx,
+                    "last_frame": result.frame_idx,
+                    "regions": set()
+                }
+            track["last_frame"] = result.frame_idx
+            track["regions"].update(name for name, inside in zip(self.roi_names, member) if inside)
+    
+    def get_state(self) -> List[Dict]:
+        """
+        Returns the collected tracks in a JSON-serialisable form, for checkpoints.
+
+        Returns:
+            list: One dictionary per track.
+        """
+        return self.to_list()
+    
+    def set_state(self, tracks: List[Dict]):
+        """
+        Restores tracks returned by get_state().
+
+        Args:
+            tracks (list): Track dictionaries.
+        """
+        self.tracks = {
+            int(track["id"][2:]): dict(track, regions=set(track["regions"]))
+            for track in tracks
+        }
+    
+    def to_list(self) -> List[Dict]:
+        """
+        Returns the tracks as JSON-serialisable dictionaries.
+
+        Returns:
+            list: One dictionary per track, ordered by ID.
+        """
+        return [
+            dict(track, regions=[name for name in self.roi_names if name in track["regions"]])
+            for _, track in sorted(self.tracks.items())
+        ]
+
+
+def write_summary(path: str, video_path: str, roi_counts: Dict[str, int], tracks: Optional[List[Dict]] = None):
+    """
+    Writes the counts and track summary of a run as JSON.
+
+    Args:
+        path (str): Output JSON path.
+        video_path (str): Path to the processed video.
+        roi_counts (dict): Number of people counted per region.
+        tracks (list, optional): Track summaries from TrackSummary.to_list().
+    """
+    summary = {"video": video_path, "roi_counts": roi_counts}
+    if tracks is not None:
+        summary["tracks"] = tracks
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
\ No newline at end of file
@@ -0,0 +1,428 @@
+"""
+Append-only columnar time series of a run, for analytics without re-running inference.
+
+Three tables are written as numbered part files of TIMESERIES_CHUNK_FRAMES frames
+each, in Parquet when pyarrow is installed and compressed NPZ otherwise:
+
+- detections: one row per tracked detection and frame (box, confidence, track
+  ID, ROI membership, and whether the box was detected or extrapolated);
+- events: one row per track entering or leaving a region;
+- counts: one row per frame with the total, rolling and current counts per region.
+"""
+
+import importlib.util
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.config import (
+    FRAME_MAX, ROLLING_WINDOW_SECONDS, TIMESERIES_FORMAT, TIMESERIES_CHUNK_FRAMES, TIMESERIES_QUEUE_CHUNKS
+)
+
+TABLES = ("detections", "events", "counts")
+TIMESERIES_FORMATS = ("auto", "parquet", "npz")
+_EXTENSIONS = {"parquet": ".parquet", "npz": ".npz"}
+# Queued to stop the writer thread
+_STOP = None
+
+
+def get_timeseries_path(target_dir: str, video_path: str) -> str:
+    """
+    Builds the directory of the time series of a video.
+
+    Args:
+        target_dir (str): Output directory of the run.
+        video_path (str): Path to the input video file.
+
+    Returns:
+        str: Directory of the time series.
+    """
+    name = os.path.basename(video_path.rstrip("/")).split('.')[0] or "stream"
+    return os.path.join(target_dir, f"TimeSeries_{name}")
+
+
+def resolve_format(file_format: str) -> str:
+    """
+    Picks the file format of the time series.
+
+    Args:
+        file_format (str): One of TIMESERIES_FORMATS.
+
+    Returns:
+        str: "parquet" or "npz".
+    """
+    if file_format not in TIMESERIES_FORMATS:
+        raise ValueError(f"Unknown time series format: {file_format}")
+    if file_format == "auto":
+        return "parquet" if importlib.util.find_spec("pyarrow") is not None else "npz"
+    return file_format
+
+
+def _part_paths(table_dir: str) -> List[str]:
+    """
+    Lists the part files of a table, in order.
+
+    Args:
+        table_dir (str): Directory of the table.
+
+    Returns:
+        list: Paths of the part files.
+    """
+    if not os.path.isdir(table_dir):
+        return []
+    return [
+        os.path.join(table_dir, name) for name in sorted(os.listdir(table_dir))
+        if name.startswith("part-") and name.endswith(tuple(_EXTENSIONS.values()))
+    ]
+
+
+def _write_part(path: str, columns: Dict[str, np.ndarray], file_format: str):
+    """
+    Writes one part file atomically.
+
+    Args:
+        path (str): Path of the part file.
+        columns (dict): Column name -> values.
+        file_format (str): "parquet" or "npz".
+    """
+    temp_path = f"{path}.tmp"
+    if file_format == "parquet":
+        import pyarrow
+        import pyarrow.parquet
+        
+        pyarrow.parquet.write_table(pyarrow.table(columns), temp_path, compression="zstd")
+    else:
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, **columns)
+    os.replace(temp_path, path)
+
+
+def read_table(path: str, table: str) -> Dict[str, np.ndarray]:
+    """
+    Reads a whole table of a time series.
+
+    Parquet parts can also be queried directly, e.g. with pyarrow.dataset, pandas
+    or DuckDB on `<path>/<table>/*.parquet`.
+
+    Args:
+        path (str): Directory of the time series.
+        table (str): One of TABLES.
+
+    Returns:
+        dict: Column name -> values of all parts, in order.
+    """
+    parts = []
+    for part_path in _part_paths(os.path.join(path, table)):
+        if part_path.endswith(".parquet"):
+            import pyarrow.parquet
+            
+            part = pyarrow.parquet.read_table(part_path)
+            parts.append({name: part.column(name).to_numpy() for name in part.column_names})
+        else:
+            with np.load(part_path, allow_pickle=False) as archive:
+                parts.append({name: archive[name] for name in archive.files})
+    if not parts:
+        return {}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+class TimeSeriesWriter:
+    """
+    Streams the results of a run to a columnar time series.
+
+    Register it with Pipeline.add_result_listener() and close() it after the run.
+    Rows are buffered in columns and every `chunk_frames` frames handed to a
+    background thread that writes them, so the inference thread never waits on
+    disk and only a bounded number of chunks is held in memory.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        roi_names: List[str],
+        fps: float,
+        file_format: str = TIMESERIES_FORMAT,
+        chunk_frames: int = TIMESERIES_CHUNK_FRAMES,
+        frame_max: int = FRAME_MAX,
+        window_seconds: float = ROLLING_WINDOW_SECONDS
+    ):
+        """
+        Initializes the TimeSeriesWriter and starts its writer thread.
+
+        Args:
+            path (str): Directory of the time series, with one subdirectory per table.
+            roi_names (list): Region names, in ROI order.
+            fps (float): Frame rate used to timestamp the frames; 0 timestamps them
+                with the wall clock, for live sources.
+            file_format (str): "parquet", "npz", or "auto" for Parquet when pyarrow
+                is installed.
+            chunk_frames (int): Frames per part file.
+            frame_max (int): Frames after which an unseen track has left its regions,
+                as in the tracker.
+            window_seconds (float): Window of the rolling counts.
+        """
+        self.path = path
+        self.roi_names = roi_names
+        self.fps = fps
+        self.format = resolve_format(file_format)
+        self.chunk_frames = max(1, chunk_frames)
+        self.frame_max = frame_max
+        self.window_seconds = window_seconds
+        self._columns: Dict[str, Dict[str, List[np.ndarray]]] = {table: {} for table in TABLES}
+        self._buffered_frames = 0
+        # Next part index of each table; parts at or after it are from an interrupted run
+        self._parts = {table: 0 for table in TABLES}
+        self._truncated = False
+        # Track ID -> {ROI index: last frame the track was seen inside}
+        self._inside: Dict[int, Dict[int, int]] = {}
+        self._recent: Deque[Tuple[float, np.ndarray]] = deque()
+        self._rolling = np.zeros(len(roi_names), dtype=np.int64)
+        self._error: Optional[BaseException] = None
+        for table in TABLES:
+            os.makedirs(os.path.join(path, table), exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"rois": roi_names, "fps": fps, "format": self.format, "tables": list(TABLES)}, f, indent=2)
+        self._queue: queue.Queue = queue.Queue(maxsize=TIMESERIES_QUEUE_CHUNKS)
+        self._thread = threading.Thread(target=self._write_chunks, name="timeseries", daemon=True)
+        self._thread.start()
+    
+    def __enter__(self) -> "TimeSeriesWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _append(self, table: str, **columns: np.ndarray):
+        """
+        Buffers rows of a table.
+
+        Args:
+            table (str): One of TABLES.
+            **columns: Column name -> values of the new rows.
+        """
+        buffered = self._columns[table]
+        for name, values in columns.items():
+            buffered.setdefault(name, []).append(values)
+    
+    def __call__(self, result):
+        """
+        Records the detections, region events and counts of one frame.
+
+        Args:
+            result (FrameResult): Analysis result of the frame.
+        """
+        frame_idx = result.frame_idx
+        timestamp = frame_idx / self.fps if self.fps > 0 else time.time()
+        detections = result.detections
+        num_detections = len(detections)
+        self._append(
+            "detections",
+            frame=np.full(num_detections, frame_idx, dtype=np.int64),
+            time=np.full(num_detections, timestamp),
+            track_id=result.track_ids.astype(np.int64),
+            x1=detections.xyxy[:, 0],
+            y1=detections.xyxy[:, 1],
+            x2=detections.xyxy[:, 2],
+            y2=detections.xyxy[:, 3],
+            conf=detections.conf,
+            cls=detections.cls,
+            is_new=result.is_new.astype(bool),
+            detected=np.full(num_detections, result.detected),
+            **{f"in_{name}": result.roi_mask[idx].astype(bool) for idx, name in enumerate(self.roi_names)}
+        )
+        # Boxes extrapolated on frames skipped by the inference stride carry no new evidence
+        if result.detected:
+            self._record_events(frame_idx, timestamp, result.track_ids.tolist(), result.roi_mask)
+        
+        new_per_roi = result.roi_mask[:, result.is_new].sum(axis=1)
+        if new_per_roi.any():
+            self._recent.append((timestamp, new_per_roi))
+            self._rolling += new_per_roi
+        while self._recent and self._recent[0][0] <= timestamp - self.window_seconds:
+            self._rolling -= self._recent.popleft()[1]
+        inside = result.roi_mask.sum(axis=1)
+        counts = {"frame": np.array([frame_idx], dtype=np.int64), "time": np.array([timestamp])}
+        for idx, name in enumerate(self.roi_names):
+            counts[f"count_{name}"] = np.array([result.roi_counts[name]], dtype=np.int64)
+            counts[f"rolling_{name}"] = np.array([self._rolling[idx]], dtype=np.int64)
+            counts[f"inside_{name}"] = np.array([inside[idx]], dtype=np.int64)
+        self._append("counts", **counts)
+        
+        self._buffered_frames += 1
+        if self._buffered_frames >= self.chunk_frames:
+            self._flush()
+    
+    def _record_events(self, frame_idx: int, timestamp: float, track_ids: List[int], roi_mask: np.ndarray):
+        """
+        Detects the tracks entering and leaving each region.
+
+        A track enters a region on the first frame it is seen inside, and leaves it
+        when seen outside, or at the last frame it was seen inside once it has not
+        been seen for more than frame_max frames.
+
+        Args:
+            frame_idx (int): Index of the frame.
+            timestamp (float): Time of the frame.
+            track_ids (list): Track ID of each detection.
+            roi_mask (numpy.ndarray): (num_rois, N) ROI membership of each detection.
+        """
+        events = []
+        for track_id, member in zip(track_ids, roi_mask.T.tolist()):
+            regions = self._inside.setdefault(track_id, {})
+            for roi_idx, inside in enumerate(member):
+                if inside:
+                    if roi_idx not in regions:
+                        events.append((frame_idx, timestamp, track_id, roi_idx, "enter"))
+                    regions[roi_idx] = frame_idx
+                elif roi_idx in regions:
+                    del regions[roi_idx]
+                    events.append((frame_idx, timestamp, track_id, roi_idx, "exit"))
+        for track_id, regions in list(self._inside.items()):
+            for roi_idx, last_frame in list(regions.items()):
+                if frame_idx - last_frame > self.frame_max:
+                    del regions[roi_idx]
+                    events.append((last_frame, self._timestamp(last_frame, timestamp), track_id, roi_idx, "exit"))
+            if not regions:
+                del self._inside[track_id]
+        if events:
+            self._append_events(events)
+    
+    def _timestamp(self, frame_idx: int, fallback: float) -> float:
+        """
+        Returns the time of a past frame.
+
+        Args:
+            frame_idx (int): Index of the frame.
+            fallback (float): Time used when frames are timestamped with the wall clock.
+
+        Returns:
+            float: Time of the frame.
+        """
+        return frame_idx / self.fps if self.fps > 0 else fallback
+    
+    def _append_events(self, events: List[tuple]):
+        """
+        Buffers region events.
+
+        Args:
+            events (list): (frame, time, track ID, ROI index, "enter" or "exit") tuples.
+        """
+        frames, times, track_ids, roi_indices, kinds = zip(*events)
+        self._append(
+            "events",
+            frame=np.array(frames, dtype=np.int64),
+            time=np.array(times, dtype=np.float64),
+            track_id=np.array(track_ids, dtype=np.int64),
+            roi=np.array([self.roi_names[idx] for idx in roi_indices], dtype=str),
+            event=np.array(kinds, dtype=str)
+        )
+    
+    def _truncate(self):
+        """
+        Removes the part files left after the resume point by an interrupted run, or
+        all of them for a new run.
+        """
+        for table in TABLES:
+            for part_path in _part_paths(os.path.join(self.path, table))[self._parts[table]:]:
+                os.remove(part_path)
+        self._truncated = True
+    
+    def _flush(self):
+        """
+        Hands the buffered rows to the writer thread, one part per non-empty table.
+        """
+        if self._error is not None:
+            raise self._error
+        if not self._truncated:
+            self._truncate()
+        for table in TABLES:
+            buffered = self._columns[table]
+            if not buffered:
+                continue
+            columns = {name: np.concatenate(values) for name, values in buffered.items()}
+            part_path = os.path.join(
+                self.path, table, f"part-{self._parts[table]:05d}{_EXTENSIONS[self.format]}"
+            )
+            self._queue.put((part_path, columns))
+            self._parts[table] += 1
+            self._columns[table] = {}
+        self._buffered_frames = 0
+    
+    def _write_chunks(self):
+        """
+        Writer thread: writes the queued parts until stopped.
+        """
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                if self._error is None:
+                    _write_part(*item, self.format)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+    
+    def get_state(self) -> Dict:
+        """
+        Writes everything buffered and returns the resume point, for checkpoints.
+
+        Returns:
+            dict: Part counts and the regions each track is inside.
+        """
+        self._flush()
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+        return {
+            "parts": dict(self._parts),
+            "inside": [
+                [track_id, roi_idx, last_frame]
+                for track_id, regions in self._inside.items() for roi_idx, last_frame in regions.items()
+            ],
+            "recent": [[timestamp, new_per_roi.tolist()] for timestamp, new_per_roi in self._recent]
+        }
+    
+    def set_state(self, state: Dict):
+        """
+        Restores a state returned by get_state(); parts written after it are dropped.
+
+        Args:
+            state (dict): State of the checkpoint.
+        """
+        self._parts = dict(state["parts"])
+        self._truncated = False
+        self._inside = {}
+        for track_id, roi_idx, last_frame in state["inside"]:
+            self._inside.setdefault(track_id, {})[roi_idx] = last_frame
+        self._recent = deque((timestamp, np.array(new_per_roi)) for timestamp, new_per_roi in state["recent"])
+        self._rolling = np.zeros(len(self.roi_names), dtype=np.int64)
+        for _, new_per_roi in self._recent:
+            self._rolling += new_per_roi
+    
+    def close(self):
+        """
+        Closes the regions still occupied, writes the remaining rows and stops the
+        writer thread.
+        """
+        if not self._thread.is_alive():
+            return
+        events = [
+            (last_frame, self._timestamp(last_frame, time.time()), track_id, roi_idx, "exit")
+            for track_id, regions in self._inside.items() for roi_idx, last_frame in regions.items()
+        ]
+        self._inside = {}
+        if events:
+            self._append_events(events)
+        try:
+            self._flush()
+        finally:
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Batch processing of many videos with a pool of long-lived worker processes.
+"""
+
+import glob
+import json
+import os
+import time
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional
+from src.video.video_processor import VideoProcessor
+from src.roi.roi_manager import load_rois
+from src.detection.detector import PedestrianDetector
+from src.pipeline.pipeline import Pipeline
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".mpg", ".mpeg", ".wmv")
+
+# Per-process state set up once by _init_worker
+_worker_state: Dict = {}
+
+
+def collect_videos(source: str) -> List[str]:
+    """
+    Lists the videos to process, largest first so long clips start early.
+
+    Args:
+        source (str): A directory (all video files directly inside it) or a glob pattern.
+
+    Returns:
+        list: Video paths sorted by decreasing file size.
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        ]
+    else:
+        paths = glob.glob(source)
+    paths = [path for path in paths if os.path.isfile(path)]
+    return sorted(paths, key=os.path.getsize, reverse=True)
+
+
+def _init_worker(roi_path: str, camera: Optional[str], target_dir: str, pipeline_options: Dict[str, Any]):
+    """
+    Loads the model once per worker process.
+
+    Args:
+        roi_path (str): Shared ROI file.
+        camera (str, optional): Camera whose ROIs are used.
+        target_dir (str): Directory for the annotated videos.
+        pipeline_options (dict): Keyword arguments passed to each Pipeline.
+    """
+    _worker_state.update(
+        detector=PedestrianDetector(),
+        roi_path=roi_path,
+        camera=camera,
+        target_dir=target_dir,
+        pipeline_options=pipeline_options
+    )
+
+
+def _process_clip(video_path: str) -> Dict:
+    """
+    Processes one clip in a worker with the worker's already loaded detector.
+
+    Args:
+        video_path (str): Path to the clip.
+
+    Returns:
+        dict: Manifest entry for the clip.
+    """
+    started = time.time()
+    entry = {"video": video_path}
+    try:
+        video_processor = VideoProcessor(video_path)
+        rois = load_rois(
+            _worker_state["roi_path"], video_processor.width, video_processor.height, _worker_state["camera"]
+        )
+        pipeline = Pipeline(
+            video_processor, rois, _worker_state["target_dir"],
+            detector=_worker_state["detector"],
+            show_progress=False,
+            **_worker_state["pipeline_options"]
+        )
+        entry.update(
+            status="ok",
+            roi_counts=pipeline.run(),
+            output_video_path=pipeline.output_video_path if pipeline.render else None,
+            frame_count=video_processor.frame_count
+        )
+    except Exception as e:
+        entry.update(status="error", error=f"{type(e).__name__}: {e}")
+    entry["seconds"] = round(time.time() - started, 3)
+    return entry
+
+
+def run_batch(
+    source: str,
+    roi_path: str,
+    target_dir: str,
+    num_workers: int,
+    manifest_path: Optional[str] = None,
+    camera: Optional[str] = None,
+    **pipeline_options: Any
+) -> List[Dict]:
+    """
+    Processes every clip of a directory or glob with a persistent worker pool.
+
+    Each worker loads the model once and reuses it for all the clips it is given.
+    A manifest line is appended per clip as soon as it finishes, so partial
+    results survive an interrupted run.
+
+    Args:
+        source (str): Directory or glob pattern of the input videos.
+        roi_path (str): ROI file shared by all clips.
+        target_dir (str): Directory for the annotated videos.
+        num_workers (int): Number of worker processes.
+        manifest_path (str, optional): JSON Lines manifest path. Defaults to
+            manifest.jsonl in target_dir.
+        camera (str, optional): Camera of the ROI file the clips come from.
+        **pipeline_options: Keyword arguments passed to each Pipeline, e.g.
+            detection_mode, batch_size, render or inference_stride.
+
+    Returns:
+        list: Manifest entries in completion order.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(target_dir, "manifest.jsonl")
+    videos = collect_videos(source)
+    entries = []
+    with Pool(
+        processes=max(1, num_workers),
+        initializer=_init_worker,
+        initargs=(roi_path, camera, target_dir, pipeline_options)
+    ) as pool, open(manifest_path, "a") as manifest:
+        for entry in pool.imap_unordered(_process_clip, videos):
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            entries.append(entry)
+    return entries
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+On-disk checkpoints of a pipeline run, used to resume after a crash.
+"""
+
+import json
+import os
+from typing import Dict, Tuple
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+# Key of the JSON metadata inside the checkpoint archive
+_META_KEY = "__meta__"
+
+
+def get_checkpoint_path(target_dir: str, video_path: str) -> str:
+    """
+    Builds the path of the checkpoint of a video.
+
+    Args:
+        target_dir (str): Output directory of the run.
+        video_path (str): Path to the input video file.
+
+    Returns:
+        str: Path of the checkpoint file.
+    """
+    return os.path.join(target_dir, f"Checkpoint_{os.path.basename(video_path).split('.')[0]}.npz")
+
+
+def write_checkpoint(path: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+    """
+    Writes a checkpoint atomically, so a crash while writing keeps the previous one.
+
+    Args:
+        path (str): Checkpoint path.
+        meta (dict): JSON-serialisable metadata.
+        arrays (dict): Named NumPy arrays.
+    """
+    temp_path = f"{path}.tmp"
+    meta = dict(meta, version=CHECKPOINT_VERSION)
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays, **{_META_KEY: np.array(json.dumps(meta))})
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def read_checkpoint(path: str) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Reads a checkpoint written by write_checkpoint().
+
+    Args:
+        path (str): Checkpoint path.
+
+    Returns:
+        tuple: The metadata and the named arrays.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    meta = json.loads(str(arrays.pop(_META_KEY)))
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}: {meta.get('version')}")
+    return meta, arrays
\ No newline at end of file
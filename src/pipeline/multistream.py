@@ -0,0 +1,257 @@
+"""
+Serving many live streams from one process with a single shared detector.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+import numpy as np
+from src.video.stream import LiveSource
+from src.roi.roi_manager import load_rois
+from src.detection.detector import PedestrianDetector
+from src.pipeline.pipeline import Pipeline
+from src.config.config import BATCH_SIZE
+
+# Number of recent frames the per-stream latency percentiles are computed over
+LATENCY_WINDOW = 200
+
+# Sleep of the scheduler when no stream has a new frame
+_IDLE_WAIT = 0.005
+
+
+def load_stream_specs(path: str) -> List[Dict]:
+    """
+    Reads the list of streams to serve.
+
+    The file (JSON, or YAML with a .yml/.yaml extension) holds either a list, or a
+    mapping with a "streams" list, of {"name", "source", "camera", "loop"} entries.
+    Only name and source are required; camera selects the ROI file entry.
+
+    Args:
+        path (str): Stream list file.
+
+    Returns:
+        list: Stream dictionaries.
+    """
+    with open(path) as f:
+        if path.lower().endswith((".yml", ".yaml")):
+            import yaml
+            
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    specs = data.get("streams", []) if isinstance(data, dict) else data
+    names = set()
+    for spec in specs:
+        if "name" not in spec or "source" not in spec:
+            raise ValueError(f"Stream entries need a name and a source: {spec}")
+        if spec["name"] in names:
+            raise ValueError(f"Duplicate stream name: {spec['name']}")
+        names.add(spec["name"])
+    if not specs:
+        raise ValueError(f"No streams defined in {path}")
+    return specs
+
+
+class StreamState:
+    """
+    One served stream: its source, its own tracker and counters (held by a
+    Pipeline used for analysis only) and its statistics.
+    """
+    
+    def __init__(self, name: str, source: LiveSource, pipeline: Pipeline):
+        """
+        Initializes the StreamState.
+
+        Args:
+            name (str): Stream name.
+            source (LiveSource): Opened live source.
+            pipeline (Pipeline): Pipeline holding the stream's tracker and counts.
+        """
+        self.name = name
+        self.source = source
+        self.pipeline = pipeline
+        self.frame_idx = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.perf_counter()
+        self.video_writer = None
+    
+    def stats(self) -> Dict:
+        """
+        Returns the stream's processing statistics.
+
+        Returns:
+            dict: Processed fps, source rates, dropped frames, latency, live tracks and counts.
+        """
+        elapsed = time.perf_counter() - self.started
+        latencies = np.asarray(self.latencies) * 1000
+        source_stats = self.source.stats()
+        return {
+            "name": self.name,
+            "frames": self.frame_idx,
+            "fps": round(self.frame_idx / elapsed, 2) if elapsed > 0 else None,
+            "source_fps": source_stats["source_fps"],
+            "dropped_frames": source_stats["dropped_frames"],
+            "latency_ms_mean": round(float(latencies.mean()), 1) if len(latencies) else None,
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+            "live_tracks": self.pipeline.tracker.live_track_count,
+            "roi_counts": dict(self.pipeline.roi_counts),
+            "ended": self.source.ended
+        }
+
+
+class MultiStreamScheduler:
+    """
+    Pulls frames from many live sources and runs them through one shared detector.
+
+    Every inference call batches at most one frame per stream, and the stream the
+    batch starts with rotates between calls, so all streams are served in fair
+    round-robin order even when the batch cannot hold all of them. Each stream
+    keeps its own tracker and counts, and sources only keep their latest frame,
+    so a slow model lowers every stream's frame rate instead of building latency.
+    """
+    
+    def __init__(
+        self,
+        specs: List[Dict],
+        roi_path: str,
+        target_dir: str,
+        detector: Optional[PedestrianDetector] = None,
+        batch_size: int = BATCH_SIZE,
+        **pipeline_options
+    ):
+        """
+        Initializes the MultiStreamScheduler and opens every source.
+
+        Args:
+            specs (list): Stream dictionaries, see load_stream_specs().
+            roi_path (str): ROI file; each stream uses the entry of its "camera".
+            target_dir (str): Directory for the annotated videos.
+            detector (PedestrianDetector, optional): Shared detector. Created when omitted.
+            batch_size (int): Maximum number of frames, from distinct streams, per inference call.
+            **pipeline_options: Keyword arguments of every stream's Pipeline, e.g. render
+                or inference_stride.
+        """
+        self.detector = detector if detector is not None else PedestrianDetector()
+        self.batch_size = max(1, batch_size)
+        self.streams: List[StreamState] = []
+        for spec in specs:
+            source = LiveSource(spec["source"], loop=spec.get("loop", False))
+            rois = load_rois(roi_path, source.width, source.height, spec.get("camera"))
+            pipeline = Pipeline(
+                source, rois, target_dir,
+                detector=self.detector,
+                show_progress=False,
+                **pipeline_options
+            )
+            pipeline.output_video_path = os.path.join(target_dir, f"Annotated_{spec['name']}.mp4")
+            self.streams.append(StreamState(spec["name"], source, pipeline))
+        self._next_stream = 0
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        """
+        Requests the scheduler to stop after the current inference call.
+        """
+        self._stop_event.set()
+    
+    def _collect_batch(self) -> List[tuple]:
+        """
+        Takes the newest frame of up to batch_size streams, in round-robin order.
+
+        Returns:
+            list: (stream, frame, captured_at) of each stream that had a new frame.
+        """
+        active = [stream for stream in self.streams if not stream.source.ended]
+        batch = []
+        for offset in range(len(active)):
+            stream = active[(self._next_stream + offset) % len(active)]
+            frame, captured_at = stream.source.poll()
+            if frame is not None:
+                batch.append((stream, stream.pipeline.prepare_frame(frame), captured_at))
+                if len(batch) == self.batch_size:
+                    break
+        if active:
+            self._next_stream = (self._next_stream + 1) % len(active)
+        return batch
+    
+    def step(self) -> int:
+        """
+        Runs one inference call over the streams that have a new frame.
+
+        Returns:
+            int: Number of frames processed.
+        """
+        batch = self._collect_batch()
+        if not batch:
+            return 0
+        inputs, plans = [], []
+        for stream, frame, _ in batch:
+            stream_inputs, stream_plans = stream.pipeline.plan_batch([frame], [stream.frame_idx])
+            plans.append((len(inputs), len(stream_inputs), stream_plans))
+            inputs.extend(stream_inputs)
+        detections = self.detector.predict_batch(inputs, batch_size=len(inputs)) if inputs else []
+        
+        for (stream, frame, captured_at), (offset, num_inputs, stream_plans) in zip(batch, plans):
+            pipeline = stream.pipeline
+            result = pipeline.track_batch([stream.frame_idx], stream_plans, detections[offset:offset + num_inputs])[0]
+            for listener in pipeline.result_listeners:
+                listener(result)
+            if pipeline.render:
+                if stream.video_writer is None:
+                    stream.video_writer = stream.source.get_video_writer(pipeline.output_video_path)
+                stream.video_writer.write(pipeline.annotate(frame, result))
+            stream.latencies.append(time.perf_counter() - captured_at)
+            stream.frame_idx += 1
+        return len(batch)
+    
+    def run(
+        self,
+        report: Optional[Callable[[List[Dict]], None]] = None,
+        report_interval: float = 5.0
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Serves the streams until they all end or stop() is called.
+
+        Args:
+            report (callable, optional): Called as report(status()) every report_interval seconds.
+            report_interval (float): Seconds between two reports.
+
+        Returns:
+            dict: Per-stream counts, keyed by stream name.
+        """
+        next_report = time.monotonic() + report_interval
+        try:
+            while not self._stop_event.is_set():
+                if all(stream.source.ended for stream in self.streams):
+                    break
+                if not self.step():
+                    time.sleep(_IDLE_WAIT)
+                if report is not None and time.monotonic() >= next_report:
+                    next_report += report_interval
+                    report(self.status())
+        finally:
+            self.release()
+        return {stream.name: dict(stream.pipeline.roi_counts) for stream in self.streams}
+    
+    def status(self) -> List[Dict]:
+        """
+        Returns the statistics of every stream.
+
+        Returns:
+            list: One StreamState.stats() dictionary per stream.
+        """
+        return [stream.stats() for stream in self.streams]
+    
+    def release(self):
+        """
+        Releases the sources and the annotated video writers.
+        """
+        for stream in self.streams:
+            stream.source.release()
+            if stream.video_writer is not None:
+                stream.video_writer.release()
+                stream.video_writer = None
\ No newline at end of file
@@ -0,0 +1,1037 @@
+import itertools
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from tqdm import tqdm
+import cv2
+import numpy as np
+from src.video.video_processor import VideoProcessor, concatenate_videos
+from src.detection.detector import PedestrianDetector
+from src.detection.detections import Detections
+from src.detection.cache import DetectionCache, describe_model, hash_video
+from src.tracking.tracker import Tracker
+from src.pipeline.stages import END_OF_STREAM, StageAborted, StageThread, get, put
+from src.pipeline.checkpoint import read_checkpoint, write_checkpoint
+from src.utils.utils import resize_frame, points_in_polygon
+from src.utils.overlay import ROIOverlay
+from src.utils.motion import MotionGate
+from src.metrics.metrics import Metrics, NULL_METRICS
+from src.config.config import (
+    VIDEO_SCALE_PERCENT, THRESHOLD_CENTERS, FRAME_MAX, PATIENCE, ALPHA,
+    DETECTION_MODE, CROP_TO_ROI_UNION, BATCH_SIZE, QUEUE_SIZE, RENDER_OUTPUT,
+    INFERENCE_STRIDE, MOTION_GATE, CHECKPOINT_INTERVAL, DETECTION_CACHE_DIR
+)
+
+DETECTION_MODES = ("roi", "full_frame")
+
+# Marker sent from the inference stage to the writer stage to take a checkpoint
+_CHECKPOINT = object()
+
+
+def get_output_video_path(target_dir: str, video_path: str) -> str:
+    """
+    Builds the path of the annotated output video.
+
+    Args:
+        target_dir (str): Directory where the annotated video is written.
+        video_path (str): Path to the input video file.
+
+    Returns:
+        str: Path of the annotated video.
+    """
+    return os.path.join(
+        target_dir,
+        f"Annotated_{os.path.basename(video_path).split('.')[0]}.mp4"
+    )
+
+
+class FrameResult:
+    """
+    Detection, tracking and counting results for a single frame.
+    """
+    
+    __slots__ = ("frame_idx", "detections", "track_ids", "is_new", "roi_mask", "roi_counts", "detected")
+    
+    def __init__(
+        self,
+        frame_idx: int,
+        detections: Detections,
+        track_ids: np.ndarray,
+        is_new: np.ndarray,
+        roi_mask: np.ndarray,
+        roi_counts: Dict[str, int],
+        detected: bool = True
+    ):
+        """
+        Initializes the FrameResult.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            detections (Detections): Tracked detections in frame coordinates.
+            track_ids (numpy.ndarray): Track ID of each detection.
+            is_new (numpy.ndarray): True for detections that started a new track.
+            roi_mask (numpy.ndarray): (num_rois, N) boolean ROI membership of each detection.
+            roi_counts (dict): Per-region counts after this frame.
+            detected (bool): False when the detector was skipped for this frame and the
+                boxes were extrapolated from the tracks.
+        """
+        self.frame_idx = frame_idx
+        self.detections = detections
+        self.track_ids = track_ids
+        self.is_new = is_new
+        self.roi_mask = roi_mask
+        self.roi_counts = roi_counts
+        self.detected = detected
+    
+    @classmethod
+    def empty(cls, frame_idx: int, num_rois: int, roi_counts: Dict[str, int], detected: bool = True) -> "FrameResult":
+        """
+        Creates the result of a frame without tracked detections.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            num_rois (int): Number of ROIs.
+            roi_counts (dict): Per-region counts after this frame.
+            detected (bool): Whether the detector ran on the frame.
+
+        Returns:
+            FrameResult: Result without detections.
+        """
+        return cls(
+            frame_idx,
+            Detections.empty(),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=bool),
+            np.empty((num_rois, 0), dtype=bool),
+            dict(roi_counts),
+            detected
+        )
+
+
+class Pipeline:
+    """
+    Runs detection, tracking, counting and annotation over a video without any GUI.
+    """
+    
+    def __init__(
+        self,
+        video_processor: VideoProcessor,
+        rois: List[Dict],
+        target_dir: str,
+        detector: Optional[PedestrianDetector] = None,
+        detection_mode: str = DETECTION_MODE,
+        batch_size: int = BATCH_SIZE,
+        queue_size: int = QUEUE_SIZE,
+        show_progress: bool = True,
+        render: bool = RENDER_OUTPUT,
+        inference_stride: int = INFERENCE_STRIDE,
+        motion_gate: bool = MOTION_GATE,
+        metrics: Optional[Metrics] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        detection_cache_dir: Optional[str] = DETECTION_CACHE_DIR,
+        threshold_centers: float = THRESHOLD_CENTERS,
+        frame_max: int = FRAME_MAX,
+        patience: int = PATIENCE,
+        crop_to_roi_union: bool = CROP_TO_ROI_UNION
+    ):
+        """
+        Initializes the Pipeline.
+
+        Args:
+            video_processor (VideoProcessor): Opened input video.
+            rois (list): List of ROI dictionaries with names, polygons, and ranges.
+            target_dir (str): Directory where the annotated video is written.
+            detector (PedestrianDetector, optional): Detector to reuse. A new one is
+                created when omitted.
+            detection_mode (str): "roi" to run the detector on every ROI crop, or
+                "full_frame" to run it once per frame and assign detections to ROIs.
+            batch_size (int): Number of frames accumulated per inference call.
+            queue_size (int): Capacity, in frames, of each queue between stages.
+            show_progress (bool): Whether to display a tqdm progress bar.
+            render (bool): Whether to draw and encode the annotated video. When False
+                only counts and frame results are produced.
+            inference_stride (int): Run the detector on every k-th frame only. Tracks
+                are extrapolated with their velocity on the frames in between.
+            motion_gate (bool): Skip the detector for ROI crops (or the full-frame image)
+                without motion since they were last detected, reusing their detections.
+            metrics (Metrics, optional): Receives per-stage timings and counters. Nothing
+                is recorded when omitted.
+            checkpoint_path (str, optional): File the state of the run is saved to every
+                `checkpoint_interval` frames, see load_checkpoint(). The annotated video
+                is then written in segments that are joined at the end of the run.
+            checkpoint_interval (int): Frames between two checkpoints.
+            detection_cache_dir (str, optional): Directory of the detection cache. Detector
+                outputs already cached for this video, model and detection geometry are
+                replayed instead of running the detector, and new ones are added.
+            threshold_centers (float): Tracker matching distance, in pixels.
+            frame_max (int): Frames a track can go unmatched and still be matched.
+            patience (int): Positions kept in each track's history.
+            crop_to_roi_union (bool): In "full_frame" mode, only pass the bounding
+                rectangle of all ROIs to the detector.
+        """
+        if detection_mode not in DETECTION_MODES:
+            raise ValueError(f"Unknown detection mode: {detection_mode}")
+        if not 1 <= inference_stride <= frame_max:
+            raise ValueError(f"Inference stride must be between 1 and FRAME_MAX ({frame_max}): {inference_stride}")
+        if checkpoint_interval < 1:
+            raise ValueError(f"Checkpoint interval must be at least 1 frame: {checkpoint_interval}")
+        self.video_processor = video_processor
+        self.rois = rois
+        self.target_dir = target_dir
+        self.detector = detector if detector is not None else PedestrianDetector()
+        self.tracker = Tracker(
+            threshold_centers=threshold_centers,
+            frame_max=frame_max,
+            patience=patience,
+            predict_motion=inference_stride > 1
+        )
+        self.roi_counts = {roi['name']: 0 for roi in rois}
+        self.output_video_path = get_output_video_path(target_dir, video_processor.video_path)
+        self.detection_mode = detection_mode
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.show_progress = show_progress
+        self.render = render
+        self._overlay: Optional[ROIOverlay] = None
+        self.count_from = 0
+        self.result_listeners: List[Callable[[FrameResult], None]] = []
+        self.detection_window = self._get_detection_window() if crop_to_roi_union else None
+        self.inference_stride = inference_stride
+        num_inputs = 1 if detection_mode == "full_frame" else len(rois)
+        self._motion_gate = MotionGate(num_inputs) if motion_gate else None
+        # Latest detections of each detector input, reused while the motion gate holds it
+        self._input_detections = [Detections.empty()] * num_inputs
+        # Last frame the detector ran on, extrapolated on the frames skipped by the stride
+        self._last_detected: Optional[FrameResult] = None
+        self.detection_cache = None
+        if detection_cache_dir is not None:
+            self.detection_cache = DetectionCache(detection_cache_dir, self._get_cache_key(), num_inputs)
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        # Closed segments of the annotated video, joined into output_video_path at the end
+        self._segments: List[str] = []
+        self._segment_path: Optional[str] = None
+        self._video_writer = None
+        self._stop_event = threading.Event()
+    
+    def _get_detection_window(self) -> Optional[List[int]]:
+        """
+        Computes the bounding rectangle of all ROIs, used to crop the frame in full-frame mode.
+
+        Returns:
+            list: [xmin, ymin, xmax, ymax] of the ROI union, or None without ROIs.
+        """
+        if not self.rois:
+            return None
+        x_min = min(roi['range'][0][0] for roi in self.rois)
+        x_max = max(roi['range'][0][1] for roi in self.rois)
+        y_min = min(roi['range'][1][0] for roi in self.rois)
+        y_max = max(roi['range'][1][1] for roi in self.rois)
+        return [x_min, y_min, x_max, y_max]
+    
+    def _get_cache_key(self) -> Dict:
+        """
+        Describes everything the detector outputs of this run depend on.
+
+        Returns:
+            dict: Detection cache key.
+        """
+        if self.detection_mode == "full_frame":
+            windows = [self.detection_window]
+        else:
+            windows = [[roi['range'][0][0], roi['range'][1][0], roi['range'][0][1], roi['range'][1][1]] for roi in self.rois]
+        return {
+            "video": hash_video(self.video_processor.video_path),
+            "detector": describe_model(self.detector),
+            "scale_percent": VIDEO_SCALE_PERCENT,
+            "detection_mode": self.detection_mode,
+            "windows": [[int(value) for value in window] if window is not None else None for window in windows]
+        }
+    
+    def _can_replay(self, first_frame: int, end_frame: Optional[int]) -> bool:
+        """
+        Checks whether a range can be processed from cached detections alone, without
+        decoding the video.
+
+        That requires no rendering, no motion gate (which compares decoded images)
+        and the detections of every frame on the inference stride in the cache.
+
+        Args:
+            first_frame (int): First frame to process.
+            end_frame (int, optional): Frame to stop before.
+
+        Returns:
+            bool: True when the frames do not need to be decoded.
+        """
+        if self.detection_cache is None or self.render or self._motion_gate is not None or end_frame is None:
+            return False
+        first_detected = -(-first_frame // self.inference_stride) * self.inference_stride
+        return self.detection_cache.contains(np.arange(first_detected, end_frame, self.inference_stride))
+    
+    def stop(self):
+        """
+        Requests the pipeline to stop after the frame currently being processed.
+        """
+        self._stop_event.set()
+    
+    def add_result_listener(self, listener: Callable[[FrameResult], None]):
+        """
+        Registers a callback receiving every FrameResult, in frame order, from the
+        inference stage.
+
+        Args:
+            listener (callable): Called as listener(result).
+        """
+        self.result_listeners.append(listener)
+    
+    def _settings(self) -> Dict:
+        """
+        Returns the settings a checkpoint is only valid for.
+
+        Returns:
+            dict: JSON-serialisable settings of the run.
+        """
+        return {
+            "video": os.path.basename(self.video_processor.video_path),
+            "frame_count": self.video_processor.frame_count,
+            "rois": [{"name": roi['name'], "polygon": np.asarray(roi['polygon']).tolist()} for roi in self.rois],
+            "detection_mode": self.detection_mode,
+            "inference_stride": self.inference_stride,
+            "motion_gate": self._motion_gate is not None,
+            "scale_percent": VIDEO_SCALE_PERCENT,
+            "tracker": [self.tracker.threshold_centers, self.tracker.frame_max, self.tracker.patience]
+        }
+    
+    def get_state(self, frame_idx: int) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """
+        Captures everything needed to continue the run after a frame.
+
+        Args:
+            frame_idx (int): Last frame processed by the inference stage.
+
+        Returns:
+            tuple: JSON-serialisable metadata (counts, settings, listener states) and
+                the named arrays of the tracker, the motion gate and the last detections.
+        """
+        meta = {
+            "frame_idx": frame_idx,
+            "roi_counts": dict(self.roi_counts),
+            "settings": self._settings(),
+            "listeners": {
+                f"{idx}:{type(listener).__name__}": listener.get_state()
+                for idx, listener in enumerate(self.result_listeners) if hasattr(listener, "get_state")
+            }
+        }
+        arrays = {f"tracker_{name}": value for name, value in self.tracker.get_state().items()}
+        for input_idx, detections in enumerate(self._input_detections):
+            arrays[f"input{input_idx}_xyxy"] = detections.xyxy
+            arrays[f"input{input_idx}_conf"] = detections.conf
+            arrays[f"input{input_idx}_cls"] = detections.cls
+        if self._motion_gate is not None:
+            for input_idx, reference in enumerate(self._motion_gate.get_state()):
+                arrays[f"motion{input_idx}"] = reference
+        last = self._last_detected
+        if last is not None:
+            meta["last_detected"] = last.frame_idx
+            arrays.update(
+                last_xyxy=last.detections.xyxy,
+                last_conf=last.detections.conf,
+                last_cls=last.detections.cls,
+                last_track_ids=last.track_ids,
+                last_roi_mask=last.roi_mask
+            )
+        return meta, arrays
+    
+    def set_state(self, meta: Dict, arrays: Dict[str, np.ndarray]):
+        """
+        Restores a state returned by get_state().
+
+        Args:
+            meta (dict): Metadata of the state.
+            arrays (dict): Named arrays of the state.
+        """
+        self.roi_counts = dict(meta["roi_counts"])
+        self.tracker.set_state({
+            name[len("tracker_"):]: value for name, value in arrays.items() if name.startswith("tracker_")
+        })
+        self._input_detections = [
+            Detections(arrays[f"input{idx}_xyxy"], arrays[f"input{idx}_conf"], arrays[f"input{idx}_cls"])
+            for idx in range(len(self._input_detections))
+        ]
+        if self._motion_gate is not None:
+            self._motion_gate.set_state([arrays[f"motion{idx}"] for idx in range(len(self._input_detections))])
+        self._last_detected = None
+        if "last_detected" in meta:
+            self._last_detected = FrameResult(
+                meta["last_detected"],
+                Detections(arrays["last_xyxy"], arrays["last_conf"], arrays["last_cls"]),
+                arrays["last_track_ids"],
+                np.zeros(len(arrays["last_track_ids"]), dtype=bool),
+                arrays["last_roi_mask"],
+                dict(self.roi_counts)
+            )
+        listener_states = meta["listeners"]
+        for idx, listener in enumerate(self.result_listeners):
+            key = f"{idx}:{type(listener).__name__}"
+            if key in listener_states:
+                listener.set_state(listener_states[key])
+    
+    def load_checkpoint(self) -> int:
+        """
+        Restores the state saved in checkpoint_path, if any, so run() continues from it.
+
+        Listeners with get_state()/set_state() methods must be registered before.
+
+        Returns:
+            int: Frame to pass as run(start_frame=...), 0 without a checkpoint.
+        """
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return 0
+        meta, arrays = read_checkpoint(self.checkpoint_path)
+        if meta["settings"] != self._settings():
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was saved with different settings")
+        missing = [path for path in meta["segments"] if not os.path.exists(path)]
+        if missing:
+            raise ValueError(f"Output segments of checkpoint {self.checkpoint_path} are missing: {missing}")
+        self.set_state(meta, arrays)
+        self._segments = list(meta["segments"])
+        return meta["frame_idx"] + 1
+    
+    def _open_video_writer(self):
+        """
+        Opens the writer of the annotated video, or of its next segment when checkpointing.
+
+        Returns:
+            cv2.VideoWriter: The opened writer.
+        """
+        path = self.output_video_path
+        if self.checkpoint_path is not None:
+            base, ext = os.path.splitext(path)
+            path = f"{base}.part{len(self._segments):04d}{ext}"
+        self._segment_path = path
+        return self.video_processor.get_video_writer(path)
+    
+    def _save_checkpoint(self, state: Tuple[Dict, Dict[str, np.ndarray]]):
+        """
+        Closes the current output segment and writes a checkpoint, from the writer stage.
+
+        Every frame up to the checkpointed one has been written when this is called,
+        so the closed segments hold exactly the frames the checkpoint covers.
+
+        Args:
+            state (tuple): State returned by get_state().
+        """
+        meta, arrays = state
+        if self._video_writer is not None:
+            self._video_writer.release()
+            self._segments.append(self._segment_path)
+            self._video_writer = self._open_video_writer()
+        write_checkpoint(self.checkpoint_path, dict(meta, segments=self._segments), arrays)
+        self.metrics.inc("checkpoints_total")
+    
+    def _finish_checkpointed_run(self):
+        """
+        Joins the output segments of a completed checkpointed run and removes the
+        checkpoint, so a new run starts from the beginning.
+        """
+        if self._segment_path is not None:
+            segments = self._segments + [self._segment_path]
+            concatenate_videos(segments, self.output_video_path)
+            for path in segments:
+                os.remove(path)
+        self._segments = []
+        self._segment_path = None
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+    
+    def run(
+        self,
+        progress: Optional[Callable[[int, int], None]] = None,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        warmup_frames: int = 0
+    ) -> Dict[str, int]:
+        """
+        Processes the video, or a range of it, and writes the annotated output.
+
+        Decoding, inference and annotation/encoding run in three threads connected
+        by bounded queues, so I/O overlaps with inference while the number of
+        frames held in memory stays capped.
+
+        Args:
+            progress (callable, optional): Called as progress(frame_idx, frame_count)
+                after each written frame.
+            start_frame (int): First frame to count and write.
+            end_frame (int, optional): Frame to stop before. Defaults to the end of the
+                video; live sources, which have no frame count, run until they end or
+                stop() is called.
+            warmup_frames (int): Frames before start_frame that are only tracked, so
+                tracks already present at start_frame are not counted again.
+
+        When resuming from load_checkpoint(), pass the frame it returned as start_frame
+        and no warm-up frames: the restored tracker state replaces them.
+
+        Returns:
+            dict: Number of people counted per region.
+        """
+        video_processor = self.video_processor
+        frame_count = video_processor.frame_count
+        if end_frame is None:
+            end_frame = frame_count if frame_count > 0 else None
+        elif frame_count > 0:
+            end_frame = min(end_frame, frame_count)
+        first_frame = max(0, start_frame - warmup_frames)
+        self.count_from = start_frame
+        self._video_writer = self._open_video_writer() if self.render else None
+        abort_event = threading.Event()
+        frame_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+        self.metrics.gauge_function("queue_depth", frame_queue.qsize, queue="frames")
+        self.metrics.gauge_function("queue_depth", result_queue.qsize, queue="results")
+        self.metrics.gauge_function("live_tracks", lambda: self.tracker.live_track_count)
+        replay = self._can_replay(first_frame, end_frame)
+        # Frames are resized into new arrays; at full scale the decoded frames themselves
+        # wait in both queues, the inference batch and the reader and writer stages
+        video_processor.hold_frames(2 if VIDEO_SCALE_PERCENT != 100 else 2 * self.queue_size + self.batch_size + 4)
+        reader = StageThread(
+            lambda: self._read_frames(frame_queue, first_frame, end_frame, abort_event, replay), "reader", abort_event
+        )
+        writer = StageThread(
+            lambda: self._write_frames(
+                result_queue, end_frame - start_frame if end_frame is not None else None,
+                progress, abort_event
+            ),
+            "writer",
+            abort_event
+        )
+        reader.start()
+        writer.start()
+        try:
+            self._infer_frames(frame_queue, result_queue, abort_event)
+        except StageAborted:
+            pass
+        except BaseException:
+            abort_event.set()
+            raise
+        finally:
+            reader.join()
+            writer.join()
+            video_processor.release()
+            if self._video_writer is not None:
+                self._video_writer.release()
+                self._video_writer = None
+            if self.detection_cache is not None:
+                self.detection_cache.flush()
+        for stage in (reader, writer):
+            if stage.error is not None:
+                raise stage.error
+        if self.checkpoint_path is not None:
+            self._finish_checkpointed_run()
+        return self.roi_counts
+    
+    def _read_frames(
+        self,
+        frame_queue: queue.Queue,
+        first_frame: int,
+        end_frame: Optional[int],
+        abort_event: threading.Event,
+        replay: bool = False
+    ):
+        """
+        Reader stage: decodes and resizes frames and feeds them to the inference stage.
+
+        Args:
+            frame_queue (queue.Queue): Output queue of (frame_idx, frame) pairs.
+            first_frame (int): Index of the first frame to read.
+            end_frame (int): Index of the frame to stop before, None to read until the
+                source ends.
+            abort_event (threading.Event): Set when any stage failed.
+            replay (bool): Only send frame indices, with None frames, since all the
+                detections come from the cache.
+        """
+        video_processor = self.video_processor
+        metrics = self.metrics
+        if replay:
+            for frame_idx in range(first_frame, end_frame):
+                if self._stop_event.is_set():
+                    break
+                put(frame_queue, (frame_idx, None), abort_event)
+            put(frame_queue, END_OF_STREAM, abort_event)
+            return
+        video_processor.seek(first_frame)
+        frame_indices = range(first_frame, end_frame) if end_frame is not None else itertools.count(first_frame)
+        for frame_idx in frame_indices:
+            if self._stop_event.is_set():
+                break
+            with metrics.timer("decode"):
+                is_frame, frame = video_processor.get_frame()
+            if not is_frame:
+                if end_frame is not None:
+                    # Frames announced by the container but not decodable
+                    metrics.inc("dropped_frames_total", end_frame - frame_idx)
+                break
+            with metrics.timer("resize"):
+                frame = self.prepare_frame(frame)
+            metrics.inc("frames_decoded_total")
+            put(frame_queue, (frame_idx, frame), abort_event)
+        put(frame_queue, END_OF_STREAM, abort_event)
+    
+    def _infer_frames(self, frame_queue: queue.Queue, result_queue: queue.Queue, abort_event: threading.Event):
+        """
+        Inference stage: batches frames, detects, tracks and counts, preserving frame order.
+
+        Args:
+            frame_queue (queue.Queue): Input queue of (frame_idx, frame) pairs.
+            result_queue (queue.Queue): Output queue of (frame, FrameResult) pairs, and of
+                checkpoint requests every `checkpoint_interval` frames.
+            abort_event (threading.Event): Set when any stage failed.
+        """
+        end_of_stream = False
+        frames_since_checkpoint = 0
+        while not end_of_stream:
+            frames, frame_indices = [], []
+            while len(frames) < self.batch_size:
+                item = get(frame_queue, abort_event)
+                if item is END_OF_STREAM:
+                    end_of_stream = True
+                    break
+                frame_indices.append(item[0])
+                frames.append(item[1])
+            
+            results = self.analyze_batch(frames, frame_indices)
+            self._record_results(results)
+            for frame, result in zip(frames, results):
+                for listener in self.result_listeners:
+                    listener(result)
+                # Warm-up frames are only used to build up the tracker state
+                if result.frame_idx >= self.count_from:
+                    put(result_queue, (frame if self.render else None, result), abort_event)
+            
+            frames_since_checkpoint += len(results)
+            due = self.checkpoint_path is not None and frames_since_checkpoint >= self.checkpoint_interval
+            if due and not end_of_stream:
+                put(result_queue, (_CHECKPOINT, self.get_state(results[-1].frame_idx)), abort_event)
+                frames_since_checkpoint = 0
+        put(result_queue, END_OF_STREAM, abort_event)
+    
+    def _record_results(self, results: List[FrameResult]):
+        """
+        Updates the frame, detection and count metrics with a batch of results.
+
+        Args:
+            results (list): Results of consecutive frames.
+        """
+        metrics = self.metrics
+        if not metrics.enabled or not results:
+            return
+        metrics.inc("frames_processed_total", len(results))
+        metrics.inc("frames_predicted_total", sum(not result.detected for result in results))
+        num_detections = sum(len(result.detections) for result in results if result.detected)
+        metrics.inc("detections_total", num_detections)
+        metrics.set("detections_per_frame", len(results[-1].detections))
+        metrics.set("last_frame", results[-1].frame_idx)
+        for region, count in results[-1].roi_counts.items():
+            metrics.set("people_counted", count, region=region)
+    
+    def _write_frames(
+        self,
+        result_queue: queue.Queue,
+        total_frames: Optional[int],
+        progress,
+        abort_event: threading.Event
+    ):
+        """
+        Annotate/encode stage: draws the results on each frame and writes it out.
+
+        Args:
+            result_queue (queue.Queue): Input queue of (frame, FrameResult) pairs, and
+                of checkpoint requests.
+            total_frames (int): Number of frames expected, for the progress bar. None
+                when unknown.
+            progress (callable, optional): Progress callback, see run().
+            abort_event (threading.Event): Set when any stage failed.
+        """
+        frame_count = self.video_processor.frame_count
+        metrics = self.metrics
+        with tqdm(total=total_frames, desc="Processing Frames", disable=not self.show_progress) as progress_bar:
+            while True:
+                item = get(result_queue, abort_event)
+                if item is END_OF_STREAM:
+                    break
+                frame, result = item
+                if frame is _CHECKPOINT:
+                    self._save_checkpoint(result)
+                    continue
+                # Write annotated frame to output video
+                if self._video_writer is not None:
+                    with metrics.timer("annotate"):
+                        frame = self.annotate(frame, result)
+                    with metrics.timer("encode"):
+                        self._video_writer.write(frame)
+                metrics.inc("frames_written_total")
+                progress_bar.update(1)
+                if progress is not None:
+                    progress(result.frame_idx, frame_count)
+    
+    def prepare_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Resizes a decoded frame to the processing scale.
+
+        Args:
+            frame (numpy.ndarray): The decoded video frame.
+
+        Returns:
+            numpy.ndarray: The frame used for detection and annotation.
+        """
+        if VIDEO_SCALE_PERCENT != 100:
+            frame = resize_frame(frame, VIDEO_SCALE_PERCENT)
+        return frame
+    
+    def process_frame(self, frame: np.ndarray, frame_idx: int) -> np.ndarray:
+        """
+        Detects, tracks and counts people in a single frame and annotates it.
+
+        Args:
+            frame (numpy.ndarray): The input video frame.
+            frame_idx (int): Index of the frame in the video.
+
+        Returns:
+            numpy.ndarray: The annotated frame.
+        """
+        return self.process_batch([frame], [frame_idx])[0]
+    
+    def process_batch(self, frames: List[np.ndarray], frame_indices: List[int]) -> List[np.ndarray]:
+        """
+        Detects, tracks, counts and annotates a batch of consecutive frames in the
+        calling thread.
+
+        Args:
+            frames (list): Consecutive input video frames.
+            frame_indices (list): Index of each frame in the video.
+
+        Returns:
+            list: The annotated frames.
+        """
+        frames = [self.prepare_frame(frame) for frame in frames]
+        results = self.analyze_batch(frames, frame_indices)
+        return [self.annotate(frame, result) for frame, result in zip(frames, results)]
+    
+    def analyze_batch(self, frames: List[np.ndarray], frame_indices: List[int]) -> List[FrameResult]:
+        """
+        Detects people in a batch of consecutive prepared frames with a single
+        batched inference call, then tracks and counts them in order.
+
+        Only frames on the inference stride are detected, and with the motion gate
+        enabled only their inputs that changed; the others are predicted or reuse
+        the previous detections of the same input.
+
+        Args:
+            frames (list): Consecutive frames, already passed through prepare_frame().
+            frame_indices (list): Index of each frame in the video.
+
+        Returns:
+            list: One FrameResult per frame.
+        """
+        if not frames:
+            return []
+        inputs, plans = self.plan_batch(frames, frame_indices)
+        with self.metrics.timer("detect"):
+            if self.detection_cache is not None:
+                detections = self._detect_cached(frame_indices, plans, inputs)
+            else:
+                detections = self.detector.predict_batch(inputs, batch_size=self.batch_size) if inputs else []
+        
+        with self.metrics.timer("track"):
+            return self.track_batch(frame_indices, plans, detections)
+    
+    def _detect_cached(
+        self,
+        frame_indices: List[int],
+        plans: List[Optional[List[Optional[int]]]],
+        inputs: List[Optional[np.ndarray]]
+    ) -> List[Detections]:
+        """
+        Takes the detections of a batch from the cache, running the detector only on
+        the inputs that are not cached and adding their results to the cache.
+
+        Args:
+            frame_indices (list): Index of each frame in the video.
+            plans (list): Detection plan of each frame, from plan_batch().
+            inputs (list): Detector inputs, None for frames that were not decoded.
+
+        Returns:
+            list: Detections of each input.
+        """
+        cache = self.detection_cache
+        slots = [None] * len(inputs)
+        for frame_idx, plan in zip(frame_indices, plans):
+            for input_idx, detection_idx in enumerate(plan or []):
+                if detection_idx is not None:
+                    slots[detection_idx] = (frame_idx, input_idx)
+        detections = [cache.get(*slot) for slot in slots]
+        missing = [idx for idx, cached in enumerate(detections) if cached is None]
+        self.metrics.inc("detection_cache_hits_total", len(inputs) - len(missing))
+        self.metrics.inc("detection_cache_misses_total", len(missing))
+        if missing:
+            computed = self.detector.predict_batch([inputs[idx] for idx in missing], batch_size=self.batch_size)
+            for idx, result in zip(missing, computed):
+                detections[idx] = result
+                cache.put(*slots[idx], result)
+        return detections
+    
+    def plan_batch(
+        self,
+        frames: List[np.ndarray],
+        frame_indices: List[int]
+    ) -> Tuple[List[np.ndarray], List[Optional[List[Optional[int]]]]]:
+        """
+        Selects the images of a batch that need to go through the detector.
+
+        Args:
+            frames (list): Consecutive frames, already passed through prepare_frame(), or
+                None for frames replayed from the detection cache.
+            frame_indices (list): Index of each frame in the video.
+
+        Returns:
+            tuple: The detector inputs (None for frames that were not decoded), and per frame either None when the frame is
+                skipped by the stride, or the index in the inputs of each of its
+                detector inputs (None for inputs held by the motion gate).
+        """
+        inputs = []
+        plans: List[Optional[List[Optional[int]]]] = []
+        for frame, frame_idx in zip(frames, frame_indices):
+            if frame_idx % self.inference_stride:
+                plans.append(None)
+                continue
+            plan = []
+            images = self._get_detection_inputs(frame) if frame is not None else [None] * len(self._input_detections)
+            for input_idx, image in enumerate(images):
+                if self._motion_gate is None or self._motion_gate.update(input_idx, image):
+                    plan.append(len(inputs))
+                    inputs.append(image)
+                else:
+                    plan.append(None)
+            plans.append(plan)
+        return inputs, plans
+    
+    def track_batch(
+        self,
+        frame_indices: List[int],
+        plans: List[Optional[List[Optional[int]]]],
+        detections: List[Detections]
+    ) -> List[FrameResult]:
+        """
+        Tracks and counts the detections of a batch, in frame order.
+
+        Args:
+            frame_indices (list): Index of each frame in the video.
+            plans (list): Detection plan of each frame, from plan_batch().
+            detections (list): Detections of the inputs sent to the detector.
+
+        Returns:
+            list: One FrameResult per frame.
+        """
+        results = []
+        for frame_idx, plan in zip(frame_indices, plans):
+            if plan is None:
+                results.append(self._predict_result(frame_idx))
+                continue
+            for input_idx, detection_idx in enumerate(plan):
+                if detection_idx is not None:
+                    self._input_detections[input_idx] = detections[detection_idx]
+            if self.detection_mode == "full_frame":
+                result = self._track_full_frame(frame_idx, self._input_detections[0])
+            else:
+                result = self._track_rois(frame_idx, self._input_detections)
+            self._last_detected = result
+            results.append(result)
+        return results
+    
+    def _predict_result(self, frame_idx: int) -> FrameResult:
+        """
+        Builds the result of a frame skipped by the inference stride by moving the
+        boxes of the last detected frame along their tracks' velocity.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+
+        Returns:
+            FrameResult: Extrapolated detections; nothing is counted on these frames.
+        """
+        last = self._last_detected
+        if last is None or len(last.detections) == 0:
+            return FrameResult.empty(frame_idx, len(self.rois), self.roi_counts, detected=False)
+        displacement, alive = self.tracker.predict(last.track_ids, frame_idx)
+        displacement = displacement[alive]
+        return FrameResult(
+            frame_idx,
+            last.detections[alive].offset(displacement[:, 0], displacement[:, 1]),
+            last.track_ids[alive],
+            np.zeros(int(alive.sum()), dtype=bool),
+            last.roi_mask[:, alive],
+            dict(self.roi_counts),
+            detected=False
+        )
+    
+    def _get_detection_inputs(self, frame: np.ndarray) -> List[np.ndarray]:
+        """
+        Returns the images passed to the detector for one frame.
+
+        Args:
+            frame (numpy.ndarray): The video frame.
+
+        Returns:
+            list: One crop per ROI in "roi" mode, a single image in "full_frame" mode.
+        """
+        if self.detection_mode == "full_frame":
+            if self.detection_window is None:
+                return [frame]
+            x_min, y_min, x_max, y_max = self.detection_window
+            return [frame[y_min:y_max, x_min:x_max]]
+        return [
+            frame[roi['range'][1][0]:roi['range'][1][1], roi['range'][0][0]:roi['range'][0][1]]
+            for roi in self.rois
+        ]
+    
+    def _track_rois(self, frame_idx: int, roi_detections: List[Detections]) -> FrameResult:
+        """
+        Tracks the detections of every ROI crop in ROI coordinates.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            roi_detections (list): Detections of each ROI crop.
+
+        Returns:
+            FrameResult: Detections in frame coordinates with their track IDs.
+        """
+        parts, ids_parts, new_parts, roi_parts = [], [], [], []
+        for roi_idx, (roi, detections) in enumerate(zip(self.rois, roi_detections)):
+            if len(detections) == 0:
+                continue
+            ids, is_new = self.tracker.update(detections.centers, frame_idx)
+            if frame_idx >= self.count_from:
+                self.roi_counts[roi['name']] += int(is_new.sum())
+            x_range, y_range = roi['range']
+            parts.append(detections.offset(x_range[0], y_range[0]))
+            ids_parts.append(ids)
+            new_parts.append(is_new)
+            roi_parts.append(np.full(len(detections), roi_idx))
+        
+        if not parts:
+            return FrameResult.empty(frame_idx, len(self.rois), self.roi_counts)
+        roi_index = np.concatenate(roi_parts)
+        return FrameResult(
+            frame_idx,
+            Detections.concatenate(parts),
+            np.concatenate(ids_parts),
+            np.concatenate(new_parts),
+            np.arange(len(self.rois))[:, None] == roi_index[None, :],
+            dict(self.roi_counts)
+        )
+    
+    def _track_full_frame(self, frame_idx: int, detections: Detections) -> FrameResult:
+        """
+        Assigns each detection to the ROIs whose polygon contains its center and
+        tracks it in frame coordinates.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            detections (Detections): Detections on the frame or the ROI union.
+
+        Returns:
+            FrameResult: Detections inside at least one ROI with their track IDs.
+        """
+        if len(detections) == 0:
+            return FrameResult.empty(frame_idx, len(self.rois), self.roi_counts)
+        if self.detection_window is not None:
+            detections = detections.offset(*self.detection_window[:2])
+        
+        centers = detections.centers
+        inside = np.stack([points_in_polygon(centers, roi['polygon']) for roi in self.rois])
+        in_any = inside.any(axis=0)
+        
+        detections = detections[in_any]
+        roi_mask = inside[:, in_any]
+        ids, is_new = self.tracker.update(centers[in_any], frame_idx)
+        if frame_idx >= self.count_from:
+            new_per_roi = roi_mask[:, is_new].sum(axis=1)
+            for roi, new_count in zip(self.rois, new_per_roi.tolist()):
+                self.roi_counts[roi['name']] += new_count
+        return FrameResult(frame_idx, detections, ids, is_new, roi_mask, dict(self.roi_counts))
+    
+    def annotate(self, frame: np.ndarray, result: FrameResult) -> np.ndarray:
+        """
+        Draws the detections, ROI polygons and counts of a frame.
+
+        Args:
+            frame (numpy.ndarray): The prepared video frame, drawn on in place.
+            result (FrameResult): Analysis result of the frame.
+
+        Returns:
+            numpy.ndarray: The annotated frame.
+        """
+        detections = result.detections
+        for box, center, obj_id, conf in zip(
+            detections.boxes.tolist(), detections.centers.tolist(),
+            result.track_ids.tolist(), detections.conf.tolist()
+        ):
+            self._draw_detection(frame, box, tuple(center), f'ID{obj_id}', conf)
+        return self.draw_overlay(frame, result.roi_counts)
+    
+    def _draw_detection(self, image: np.ndarray, box: tuple, center: tuple, obj_id: str, conf: float):
+        """
+        Draws a detection box, its center and its label.
+
+        Args:
+            image (numpy.ndarray): Image to draw on, in place.
+            box (tuple): (xmin, ymin, xmax, ymax) of the detection.
+            center (tuple): (x, y) center of the detection.
+            obj_id (str): Tracking ID of the detection.
+            conf (float): Detection confidence.
+        """
+        xmin, ymin, xmax, ymax = box
+        cv2.rectangle(image, (xmin, ymin), (xmax, ymax), (0, 0, 255), 2)
+        cv2.circle(image, center, 5, (0, 0, 255), -1)
+        cv2.putText(
+            image,
+            f"{obj_id}: {conf:.2f}",
+            (xmin, ymin - 10),
+            cv2.FONT_HERSHEY_TRIPLEX,
+            0.8,
+            (0, 0, 255),
+            1
+        )
+    
+    def draw_overlay(self, frame: np.ndarray, roi_counts: Optional[Dict[str, int]] = None) -> np.ndarray:
+        """
+        Draws the ROI polygons and the counts on the frame, in place.
+
+        Args:
+            frame (numpy.ndarray): The video frame.
+            roi_counts (dict, optional): Counts to display. Defaults to the current counts.
+
+        Returns:
+            numpy.ndarray: The frame with the overlay blended in.
+        """
+        if self._overlay is None or self._overlay.frame_shape != frame.shape[:2]:
+            self._overlay = ROIOverlay(self.rois, frame.shape, color=(255, 0, 0), alpha=ALPHA)
+        frame = self._overlay.apply(frame)
+        
+        # Display counts
+        y_coordinate = 40
+        roi_counts = self.roi_counts if roi_counts is None else roi_counts
+        for region, count in roi_counts.items():
+            cv2.putText(
+                frame,
+                f'People in {region}: {count}',
+                (30, y_coordinate),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                1,
+                (255, 0, 0),
+                1
+            )
+            y_coordinate += 50
+        return frame
\ No newline at end of file
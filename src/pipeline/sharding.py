@@ -0,0 +1,170 @@
+"""
+Parallel processing of one long video split into time segments.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from src.video.video_processor import VideoProcessor, concatenate_videos
+from src.pipeline.pipeline import Pipeline, get_output_video_path
+from src.config.config import SHARD_OVERLAP_FRAMES, RENDER_OUTPUT
+
+# Maximum distance, in pixels, between two observations of the same track in the overlap window
+STITCH_DISTANCE = 2.0
+
+
+def plan_segments(frame_count: int, num_segments: int) -> List[Tuple[int, int]]:
+    """
+    Splits a video into contiguous segments of nearly equal length.
+
+    Args:
+        frame_count (int): Number of frames in the video.
+        num_segments (int): Number of segments.
+
+    Returns:
+        list: (start_frame, end_frame) of each non-empty segment.
+    """
+    bounds = np.linspace(0, frame_count, max(1, num_segments) + 1).astype(int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _process_segment(task: Dict) -> Dict:
+    """
+    Worker entry point: processes one segment with its own detector.
+
+    Args:
+        task (dict): Segment description built by process_sharded().
+
+    Returns:
+        dict: Segment counts, part video path, and the track observations of the
+            head (warm-up) and tail overlap windows used for stitching.
+    """
+    video_processor = VideoProcessor(task["video_path"])
+    pipeline = Pipeline(video_processor, task["rois"], task["target_dir"], **task["pipeline_options"])
+    pipeline.output_video_path = task["part_path"]
+    start, end, overlap = task["start"], task["end"], task["overlap"]
+    head, tail = [], []
+    
+    def collect(result):
+        if result.frame_idx < start:
+            window = head
+        elif result.frame_idx >= end - overlap:
+            window = tail
+        else:
+            return
+        centers = result.detections.centers
+        for track_id, center in zip(result.track_ids.tolist(), centers.tolist()):
+            window.append((result.frame_idx, track_id, center[0], center[1]))
+    
+    pipeline.add_result_listener(collect)
+    roi_counts = pipeline.run(start_frame=start, end_frame=end, warmup_frames=task["warmup"])
+    return {
+        "roi_counts": roi_counts,
+        "part_path": task["part_path"],
+        "head": head,
+        "tail": tail,
+        "next_id": pipeline.tracker.next_id
+    }
+
+
+def stitch_tracks(previous_tail: List[tuple], head: List[tuple]) -> Dict[int, int]:
+    """
+    Maps tracks of a segment's warm-up window onto the previous segment's tracks.
+
+    Both segments processed the overlap frames, so the same person appears at the
+    same position in the same frame; each warm-up track is mapped to the previous
+    track it shares most observations with.
+
+    Args:
+        previous_tail (list): (frame, track_id, x, y) observations of the previous segment.
+        head (list): (frame, track_id, x, y) observations of the warm-up window.
+
+    Returns:
+        dict: Track ID in this segment -> track ID in the previous segment.
+    """
+    by_frame: Dict[int, List[tuple]] = {}
+    for frame_idx, track_id, x, y in previous_tail:
+        by_frame.setdefault(frame_idx, []).append((track_id, x, y))
+    
+    votes: Dict[int, Dict[int, int]] = {}
+    for frame_idx, track_id, x, y in head:
+        for previous_id, px, py in by_frame.get(frame_idx, ()):
+            if np.hypot(px - x, py - y) <= STITCH_DISTANCE:
+                track_votes = votes.setdefault(track_id, {})
+                track_votes[previous_id] = track_votes.get(previous_id, 0) + 1
+    return {track_id: max(track_votes, key=track_votes.get) for track_id, track_votes in votes.items()}
+
+
+def process_sharded(
+    video_path: str,
+    rois: List[Dict],
+    target_dir: str,
+    num_workers: int,
+    overlap: int = SHARD_OVERLAP_FRAMES,
+    **pipeline_options: Any
+) -> Dict:
+    """
+    Processes one video as parallel time segments and merges the results.
+
+    Each segment after the first starts `overlap` frames early and only tracks
+    those frames, so people already present at the segment start are matched to
+    existing tracks instead of being counted again. Annotated segments are
+    concatenated into the usual output video; the on-frame counters and track
+    IDs in each segment are local to that segment.
+
+    Args:
+        video_path (str): Path to the input video file.
+        rois (list): List of ROI dictionaries.
+        target_dir (str): Directory where the annotated video is written.
+        num_workers (int): Number of worker processes and segments.
+        overlap (int): Number of warm-up frames shared with the previous segment.
+        **pipeline_options: Keyword arguments passed to each segment's Pipeline,
+            e.g. detection_mode, batch_size, render or inference_stride.
+
+    Returns:
+        dict: "roi_counts", "output_video_path" (None when not rendering) and
+            "track_count", the number of distinct tracks after stitching.
+    """
+    video_processor = VideoProcessor(video_path)
+    frame_count = video_processor.frame_count
+    video_processor.release()
+    
+    output_video_path = get_output_video_path(target_dir, video_path)
+    base, _ = os.path.splitext(output_video_path)
+    segments = plan_segments(frame_count, num_workers)
+    tasks = [
+        {
+            "video_path": video_path,
+            "rois": rois,
+            "target_dir": target_dir,
+            "pipeline_options": pipeline_options,
+            "start": start,
+            "end": end,
+            "overlap": overlap,
+            "warmup": overlap if idx > 0 else 0,
+            "part_path": f"{base}.part{idx:03d}.mp4"
+        }
+        for idx, (start, end) in enumerate(segments)
+    ]
+    with ProcessPoolExecutor(max_workers=max(1, num_workers)) as executor:
+        results = list(executor.map(_process_segment, tasks))
+    
+    roi_counts = {roi['name']: 0 for roi in rois}
+    track_count = 0
+    previous = None
+    for result in results:
+        for region, count in result["roi_counts"].items():
+            roi_counts[region] += count
+        continued = stitch_tracks(previous["tail"], result["head"]) if previous is not None else {}
+        track_count += result["next_id"] - len(continued)
+        previous = result
+    
+    if pipeline_options.get("render", RENDER_OUTPUT):
+        part_paths = [result["part_path"] for result in results]
+        concatenate_videos(part_paths, output_video_path)
+        for path in part_paths:
+            os.remove(path)
+    else:
+        output_video_path = None
+    return {"roi_counts": roi_counts, "output_video_path": output_video_path, "track_count": track_count}
\ No newline at end of file
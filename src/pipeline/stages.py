@@ -0,0 +1,92 @@
+"""
+Helpers for running pipeline stages in threads connected by bounded queues.
+"""
+
+import queue
+import threading
+from typing import Any, Callable
+
+# Marks the end of a stream of items in a stage queue
+END_OF_STREAM = object()
+
+_POLL_INTERVAL = 0.1
+
+
+class StageAborted(Exception):
+    """
+    Raised inside a stage when another stage has failed.
+    """
+
+
+class StageThread(threading.Thread):
+    """
+    Daemon thread running one pipeline stage and keeping the exception it failed with.
+    """
+    
+    def __init__(self, target: Callable[[], None], name: str, abort_event: threading.Event):
+        """
+        Initializes the StageThread.
+
+        Args:
+            target (callable): The stage body.
+            name (str): Thread name, used in error messages.
+            abort_event (threading.Event): Set when this stage fails so the others stop.
+        """
+        super().__init__(name=name, daemon=True)
+        self._stage_target = target
+        self.abort_event = abort_event
+        self.error = None
+    
+    def run(self):
+        try:
+            self._stage_target()
+        except StageAborted:
+            pass
+        except BaseException as e:
+            self.error = e
+            self.abort_event.set()
+
+
+def put(stage_queue: queue.Queue, item: Any, abort_event: threading.Event):
+    """
+    Puts an item on a bounded queue, blocking while it is full (back-pressure).
+
+    Args:
+        stage_queue (queue.Queue): Destination queue.
+        item: Item to enqueue.
+        abort_event (threading.Event): Aborts the wait when another stage failed.
+
+    Raises:
+        StageAborted: If the pipeline was aborted while waiting.
+    """
+    while True:
+        if abort_event.is_set():
+            raise StageAborted()
+        try:
+            stage_queue.put(item, timeout=_POLL_INTERVAL)
+            return
+        except queue.Full:
+            continue
+
+
+def get(stage_queue: queue.Queue, abort_event: threading.Event) -> Any:
+    """
+    Gets the next item from a queue, blocking while it is empty.
+
+    Args:
+        stage_queue (queue.Queue): Source queue.
+        abort_event (threading.Event): Aborts the wait when another stage failed.
+
+    Returns:
+        The next item, or END_OF_STREAM.
+
+    Raises:
+        StageAborted: If the pipeline was aborted while waiting.
+    """
+    while True:
+        if abort_event.is_set():
+            raise StageAborted()
+        try:
+            return stage_queue.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
\ No newline at end of file
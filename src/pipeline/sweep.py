@@ -0,0 +1,220 @@
+"""
+Grid search of the tracking and counting settings over cached detections.
+
+The detector runs at most once per video, on full frames so every ROI polygon
+can be evaluated on the same detections; each combination of THRESHOLD_CENTERS,
+FRAME_MAX, PATIENCE and ROI file then replays them without the model.
+"""
+
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.video.video_processor import VideoProcessor
+from src.detection.detector import PedestrianDetector
+from src.detection.backends import MODEL_PATHS
+from src.pipeline.pipeline import Pipeline
+from src.roi.roi_manager import load_rois
+from src.config.config import DETECTOR_BACKEND, BATCH_SIZE
+
+
+class ReplayDetector:
+    """
+    Stands in for PedestrianDetector when every detection comes from the cache.
+
+    It describes the same model as the detector of its backend, so it opens the
+    same cache entry, but never loads the model.
+    """
+    
+    def __init__(self, backend: str = DETECTOR_BACKEND):
+        """
+        Initializes the ReplayDetector.
+
+        Args:
+            backend (str): Name of the backend the detections were cached with.
+        """
+        self.backend_name = backend
+        self.model_path = MODEL_PATHS[backend]
+    
+    def predict_batch(self, frames: List[np.ndarray], batch_size: int = BATCH_SIZE):
+        """
+        Fails, since the sweep only evaluates fully cached videos.
+        """
+        raise RuntimeError("Detections are missing from the detection cache")
+
+
+def load_ground_truth(path: str) -> Dict[str, int]:
+    """
+    Reads the true number of people per region.
+
+    Args:
+        path (str): JSON file mapping region names to counts. A counts summary
+            written by the run command, with a "roi_counts" entry, is also accepted.
+
+    Returns:
+        dict: True count per region.
+    """
+    with open(path) as f:
+        truth = json.load(f)
+    return {region: int(count) for region, count in truth.get("roi_counts", truth).items()}
+
+
+def _create_pipeline(video_path: str, rois: List[Dict], cache_dir: str, detector, **tracker_settings) -> Pipeline:
+    """
+    Creates a pipeline counting full-frame detections through the detection cache.
+
+    Args:
+        video_path (str): Path to the input video file.
+        rois (list): ROI dictionaries.
+        cache_dir (str): Directory of the detection cache.
+        detector: PedestrianDetector or ReplayDetector.
+        **tracker_settings: threshold_centers, frame_max and patience.
+
+    Returns:
+        Pipeline: Pipeline without rendering.
+    """
+    return Pipeline(
+        VideoProcessor(video_path),
+        rois,
+        os.path.dirname(os.path.abspath(video_path)),
+        detector=detector,
+        detection_mode="full_frame",
+        show_progress=False,
+        render=False,
+        detection_cache_dir=cache_dir,
+        crop_to_roi_union=False,
+        **tracker_settings
+    )
+
+
+def cache_detections(video_path: str, rois: List[Dict], cache_dir: str, backend: str = DETECTOR_BACKEND) -> bool:
+    """
+    Runs the detector on the frames of a video that are not in the cache yet.
+
+    Args:
+        video_path (str): Path to the input video file.
+        rois (list): ROI dictionaries; they do not change the cached detections.
+        cache_dir (str): Directory of the detection cache.
+        backend (str): Detector backend.
+
+    Returns:
+        bool: True when the detector had to run.
+    """
+    pipeline = _create_pipeline(video_path, rois, cache_dir, ReplayDetector(backend))
+    complete = pipeline.detection_cache.contains(np.arange(pipeline.video_processor.frame_count))
+    pipeline.video_processor.release()
+    if complete:
+        return False
+    pipeline = _create_pipeline(video_path, rois, cache_dir, PedestrianDetector(backend))
+    pipeline.show_progress = True
+    pipeline.run()
+    return True
+
+
+def _evaluate(task: Dict) -> Dict:
+    """
+    Counts the people of a video with one combination of settings.
+
+    Args:
+        task (dict): Video, ROIs, cache directory, backend and tracker settings.
+
+    Returns:
+        dict: Counts and runtime of the combination.
+    """
+    started = time.perf_counter()
+    pipeline = _create_pipeline(
+        task["video_path"], task["rois"], task["cache_dir"], ReplayDetector(task["backend"]), **task["settings"]
+    )
+    roi_counts = pipeline.run()
+    return {"roi_counts": roi_counts, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def score(roi_counts: Dict[str, int], ground_truth: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Compares counts with the ground truth.
+
+    Args:
+        roi_counts (dict): Counted people per region.
+        ground_truth (dict): True count per region; regions missing from the counts
+            are counted as 0.
+
+    Returns:
+        dict: Signed error per region, total absolute error, and the absolute error
+            relative to the total true count.
+    """
+    errors = {region: roi_counts.get(region, 0) - truth for region, truth in ground_truth.items()}
+    abs_error = sum(abs(error) for error in errors.values())
+    total = sum(ground_truth.values())
+    return {
+        "errors": errors,
+        "abs_error": abs_error,
+        "relative_error": round(abs_error / total, 4) if total else None
+    }
+
+
+def run_sweep(
+    video_path: str,
+    roi_files: List[str],
+    ground_truth: Dict[str, int],
+    cache_dir: str,
+    threshold_centers: List[float],
+    frame_max: List[int],
+    patience: List[int],
+    camera: Optional[str] = None,
+    num_workers: int = 1,
+    backend: str = DETECTOR_BACKEND
+) -> List[Dict]:
+    """
+    Evaluates every combination of tracker settings and ROI files against ground truth.
+
+    Args:
+        video_path (str): Path to the input video file.
+        roi_files (list): ROI files to compare.
+        ground_truth (dict): True count per region.
+        cache_dir (str): Directory of the detection cache, filled first if needed.
+        threshold_centers (list): THRESHOLD_CENTERS values.
+        frame_max (list): FRAME_MAX values.
+        patience (list): PATIENCE values.
+        camera (str, optional): Camera entry of the ROI files.
+        num_workers (int): Number of worker processes.
+        backend (str): Detector backend.
+
+    Returns:
+        list: One row per combination, by increasing error, then runtime.
+    """
+    video_processor = VideoProcessor(video_path)
+    width, height = video_processor.width, video_processor.height
+    video_processor.release()
+    rois_by_file = {path: load_rois(path, width, height, camera) for path in roi_files}
+    cache_detections(video_path, rois_by_file[roi_files[0]], cache_dir, backend)
+    
+    combinations = list(itertools.product(roi_files, threshold_centers, frame_max, patience))
+    tasks = [
+        {
+            "video_path": video_path,
+            "rois": rois_by_file[roi_file],
+            "cache_dir": cache_dir,
+            "backend": backend,
+            "settings": {"threshold_centers": threshold, "frame_max": max_gap, "patience": history}
+        }
+        for roi_file, threshold, max_gap, history in combinations
+    ]
+    with ProcessPoolExecutor(max_workers=max(1, num_workers)) as executor:
+        results = list(executor.map(_evaluate, tasks))
+    
+    rows = []
+    for (roi_file, threshold, max_gap, history), result in zip(combinations, results):
+        rows.append({
+            "rois": roi_file,
+            "threshold_centers": threshold,
+            "frame_max": max_gap,
+            "patience": history,
+            "roi_counts": result["roi_counts"],
+            **score(result["roi_counts"], ground_truth),
+            "seconds": result["seconds"]
+        })
+    rows.sort(key=lambda row: (row["abs_error"], row["seconds"]))
+    return rows
\ No newline at end of file
@@ -1,29 +1,215 @@
+import json
+import os
 import cv2
-from typing import List, Dict
-import supervision as sv
+from typing import List, Dict, Optional
 import numpy as np
 from src.video.video_processor import VideoProcessor
 
+# Camera key used for ROI files that do not name their camera
+DEFAULT_CAMERA = "default"
+
+def define_roi(points: List[tuple], region_name: str, frame_width: int, frame_height: int) -> Dict:
+    """
+    Defines the ROI dictionary based on polygon points.
+
+    Args:
+        points (list): List of (x, y) tuples defining the ROI.
+        region_name (str): Name of the ROI.
+        frame_width (int): Width of the frames the ROI applies to.
+        frame_height (int): Height of the frames the ROI applies to.
+
+    Returns:
+        dict: ROI dictionary with name, polygon, and range.
+    """
+    roi_x = min(p[0] for p in points)
+    roi_y = min(p[1] for p in points)
+    roi_width = max(p[0] for p in points) - roi_x
+    roi_height = max(p[1] for p in points) - roi_y
+    
+    x_range = [max(roi_x, 0), min(roi_x + roi_width, frame_width - 1)]
+    y_range = [max(roi_y, 0), min(roi_y + roi_height, frame_height - 1)]
+    
+    roi = {
+        "name": region_name,
+        "polygon": points,
+        "range": [x_range, y_range]
+    }
+    return roi
+
+def _read_roi_file(path: str) -> Dict:
+    """
+    Reads a JSON or YAML ROI file.
+
+    Args:
+        path (str): Path to the ROI file.
+
+    Returns:
+        dict: File contents normalised to ``{"cameras": {camera: entry}}``.
+    """
+    with open(path, "r") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    
+    if data is None:
+        return {"cameras": {}}
+    # Legacy single-camera files: a bare list, or an object with a "rois" key
+    if isinstance(data, list):
+        data = {"rois": data}
+    if "cameras" not in data:
+        data = {"cameras": {DEFAULT_CAMERA: data}}
+    return data
+
+def _write_roi_file(path: str, data: Dict):
+    """
+    Atomically writes a JSON or YAML ROI file.
+
+    Args:
+        path (str): Path to the ROI file.
+        data (dict): File contents.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml
+            yaml.safe_dump(data, f, sort_keys=False)
+        else:
+            json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def validate_rois(rois: List[Dict], frame_width: int, frame_height: int):
+    """
+    Checks that every ROI polygon has at least three points inside the frame.
+
+    Args:
+        rois (list): List of ROI dictionaries.
+        frame_width (int): Width of the (scaled) frames the ROIs apply to.
+        frame_height (int): Height of the (scaled) frames the ROIs apply to.
+
+    Raises:
+        ValueError: If a polygon is degenerate or does not fit in the frame.
+    """
+    names = [roi['name'] for roi in rois]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate ROI names: {names}")
+    for roi in rois:
+        points = roi['polygon']
+        if len(points) < 3:
+            raise ValueError(f"ROI '{roi['name']}' needs at least 3 points, got {len(points)}")
+        outside = [p for p in points if not (0 <= p[0] < frame_width and 0 <= p[1] < frame_height)]
+        if outside:
+            raise ValueError(
+                f"ROI '{roi['name']}' has points {outside} outside the {frame_width}x{frame_height} frame"
+            )
+
+def load_rois(path: str, frame_width: int, frame_height: int, camera: Optional[str] = None) -> List[Dict]:
+    """
+    Loads ROI definitions from a JSON or YAML file without opening the video.
+
+    The file maps camera names to their regions::
+
+        {"cameras": {"entrance-cam": {"frame_size": [1280, 720],
+                                      "rois": [{"name": "door", "polygon": [[x, y], ...]}]}}}
+
+    A bare list of ROIs, or an object with a "rois" key, is read as a single
+    camera. When the stored frame size differs from the processing frame size
+    (e.g. after changing VIDEO_SCALE_PERCENT), polygons are rescaled.
+
+    Args:
+        path (str): Path to the ROI file.
+        frame_width (int): Width of the (scaled) frames the ROIs apply to.
+        frame_height (int): Height of the (scaled) frames the ROIs apply to.
+        camera (str, optional): Camera to load. May be omitted if the file has one camera.
+
+    Returns:
+        list: List of ROI dictionaries with names, polygons, and ranges.
+
+    Raises:
+        ValueError: If the camera is unknown or ambiguous, or the polygons do not fit the frame.
+    """
+    cameras = _read_roi_file(path)["cameras"]
+    if camera is None:
+        if len(cameras) != 1:
+            raise ValueError(f"ROI file {path} defines cameras {sorted(cameras)}; select one")
+        camera = next(iter(cameras))
+    if camera not in cameras:
+        raise ValueError(f"Camera '{camera}' not found in ROI file {path}")
+    
+    entry = cameras[camera]
+    scale_x, scale_y = 1.0, 1.0
+    if entry.get("frame_size"):
+        stored_width, stored_height = entry["frame_size"]
+        scale_x, scale_y = frame_width / stored_width, frame_height / stored_height
+    
+    def rescale(point):
+        if scale_x == 1.0 and scale_y == 1.0:
+            return (int(point[0]), int(point[1]))
+        # Rounding may push points drawn on the last row/column just outside the frame
+        return (
+            min(int(round(point[0] * scale_x)), frame_width - 1),
+            min(int(round(point[1] * scale_y)), frame_height - 1)
+        )
+    
+    rois = [
+        define_roi(
+            [rescale(p) for p in roi["polygon"]],
+            roi["name"],
+            frame_width,
+            frame_height
+        )
+        for roi in entry["rois"]
+    ]
+    validate_rois(rois, frame_width, frame_height)
+    return rois
+
+def save_rois(path: str, rois: List[Dict], frame_width: int, frame_height: int, camera: str = DEFAULT_CAMERA):
+    """
+    Saves ROI definitions for a camera, keeping the other cameras of the file.
+
+    Args:
+        path (str): Path to the ROI file (.json, .yaml or .yml).
+        rois (list): List of ROI dictionaries.
+        frame_width (int): Width of the frames the polygons were drawn on.
+        frame_height (int): Height of the frames the polygons were drawn on.
+        camera (str): Camera the ROIs belong to.
+    """
+    validate_rois(rois, frame_width, frame_height)
+    data = _read_roi_file(path) if os.path.exists(path) else {"cameras": {}}
+    data["cameras"][camera] = {
+        "frame_size": [frame_width, frame_height],
+        "rois": [
+            {"name": roi['name'], "polygon": [[int(p[0]), int(p[1])] for p in roi['polygon']]}
+            for roi in rois
+        ]
+    }
+    _write_roi_file(path, data)
+
 class ROIManager:
     """
     Handles extraction and processing of Regions of Interest (ROIs) from video frames.
     """
     
-    def __init__(self, video_path: str, regions: List[str]):
+    def __init__(self, video_path: str, regions: List[str], frame: Optional[np.ndarray] = None):
         """
         Initializes the ROIManager with the video path and region names.
 
         Args:
             video_path (str): Path to the video file.
             regions (list): List of region names.
+            frame (numpy.ndarray, optional): Already decoded (scaled) frame to draw the
+                regions on. The first frame of the video is read when omitted.
         """
         self.video_path = video_path
         self.regions = regions
         self.ROIs: List[Dict] = []
-        self.video_info = sv.VideoInfo.from_video_path(video_path)
-        self.generator = sv.get_video_frames_generator(video_path)
-        self.iterator = iter(self.generator)
-        self.frame = next(self.iterator)
+        if frame is None:
+            video_processor = VideoProcessor(video_path)
+            frame = video_processor.read_preview_frame()
+            video_processor.release()
+        self.frame = frame
+        self.frame_height, self.frame_width = frame.shape[:2]
     
     def select_rois(self) -> List[Dict]:
         """
@@ -82,17 +268,4 @@ class ROIManager:
         Returns:
             dict: ROI dictionary with name, polygon, and range.
         """
-        roi_x = min(p[0] for p in points)
-        roi_y = min(p[1] for p in points)
-        roi_width = max(p[0] for p in points) - roi_x
-        roi_height = max(p[1] for p in points) - roi_y
-        
-        x_range = [max(roi_x, 0), min(roi_x + roi_width, self.video_info.width - 1)]
-        y_range = [max(roi_y, 0), min(roi_y + roi_height, self.video_info.height - 1)]
-        
-        roi = {
-            "name": region_name,
-            "polygon": points,
-            "range": [x_range, y_range]
-        }
-        return roi
\ No newline at end of file
+        return define_roi(points, region_name, self.frame_width, self.frame_height)
\ No newline at end of file
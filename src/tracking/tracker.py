@@ -1,12 +1,21 @@
 import numpy as np
-from typing import Dict, Tuple
+from collections import deque
+from typing import Deque, Dict, Tuple
 
 class Tracker:
     """
     Tracks pedestrians across video frames.
+
+    Live tracks are kept in compact arrays (ID, last position, last frame) so a
+    whole frame of detections is matched against all tracks at once. Each track
+    keeps at most `patience` positions of history, and tracks that have not been
+    seen for more than `frame_max` frames are retired.
+
+    Every track also keeps a velocity estimated from its last two observations,
+    used to extrapolate it over frames without detections.
     """
     
-    def __init__(self, threshold_centers: int, frame_max: int, patience: int):
+    def __init__(self, threshold_centers: int, frame_max: int, patience: int, predict_motion: bool = False):
         """
         Initializes the Tracker with tracking parameters.
 
@@ -14,12 +23,184 @@ class Tracker:
             threshold_centers (int): Distance threshold for tracking.
             frame_max (int): Maximum frame difference for tracking.
             patience (int): Number of frames to keep tracking history.
+            predict_motion (bool): Match detections against the positions extrapolated
+                with each track's velocity instead of its last position. Useful when
+                detections are only available every few frames.
         """
         self.threshold_centers = threshold_centers
         self.frame_max = frame_max
         self.patience = patience
-        self.centers_old: Dict[str, Dict[int, Tuple[int, int]]] = {}
-        self.last_key = ''
+        self.predict_motion = predict_motion
+        self.next_id = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._last_pos = np.empty((0, 2), dtype=np.float64)
+        self._velocity = np.empty((0, 2), dtype=np.float64)
+        self._last_frame = np.empty(0, dtype=np.int64)
+        self._history: Dict[int, Deque[Tuple[int, int, int]]] = {}
+    
+    @property
+    def live_track_count(self) -> int:
+        """
+        Number of tracks that can still be matched.
+        """
+        return len(self._ids)
+    
+    @property
+    def last_key(self) -> str:
+        """
+        ID of the most recently created track, or '' before the first one.
+        """
+        return f'ID{self.next_id - 1}' if self.next_id else ''
+    
+    @property
+    def centers_old(self) -> Dict[str, Dict[int, Tuple[int, int]]]:
+        """
+        Position history of the live tracks, keyed by track ID then frame number.
+        """
+        return {
+            f'ID{track_id}': {frame: (x, y) for frame, x, y in history}
+            for track_id, history in self._history.items()
+        }
+    
+    def update(self, centers: np.ndarray, current_frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Matches all detections of a frame to the live tracks at once.
+
+        Detections are assigned greedily to the nearest live track within
+        `threshold_centers`, each track taking at most one detection per call.
+        Unmatched detections start new tracks.
+
+        Args:
+            centers (numpy.ndarray): (N, 2) array of detection centers.
+            current_frame (int): Current frame number.
+
+        Returns:
+            tuple: Track ID of every detection and a boolean array flagging new tracks.
+        """
+        self._retire(current_frame)
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        num_detections = len(centers)
+        track_idx = np.full(num_detections, -1, dtype=np.int64)
+        
+        if num_detections and len(self._ids):
+            positions = self._last_pos
+            if self.predict_motion:
+                positions = positions + self._velocity * (current_frame - self._last_frame)[:, None]
+            distances = np.linalg.norm(centers[:, None, :] - positions[None, :, :], axis=2)
+            det_candidates, track_candidates = np.nonzero(distances < self.threshold_centers)
+            order = np.argsort(distances[det_candidates, track_candidates], kind='stable')
+            taken = set()
+            for det, track in zip(det_candidates[order].tolist(), track_candidates[order].tolist()):
+                if track_idx[det] < 0 and track not in taken:
+                    track_idx[det] = track
+                    taken.add(track)
+        
+        is_new = track_idx < 0
+        matched = ~is_new
+        ids = np.empty(num_detections, dtype=np.int64)
+        ids[matched] = self._ids[track_idx[matched]]
+        matched_idx = track_idx[matched]
+        gaps = current_frame - self._last_frame[matched_idx]
+        moved = gaps > 0
+        self._velocity[matched_idx[moved]] = (
+            (centers[matched][moved] - self._last_pos[matched_idx[moved]]) / gaps[moved, None]
+        )
+        self._last_pos[matched_idx] = centers[matched]
+        self._last_frame[matched_idx] = current_frame
+        
+        num_new = int(is_new.sum())
+        if num_new:
+            ids[is_new] = np.arange(self.next_id, self.next_id + num_new)
+            self.next_id += num_new
+            self._ids = np.concatenate([self._ids, ids[is_new]])
+            self._last_pos = np.concatenate([self._last_pos, centers[is_new]])
+            self._velocity = np.concatenate([self._velocity, np.zeros((num_new, 2))])
+            self._last_frame = np.concatenate([self._last_frame, np.full(num_new, current_frame)])
+        
+        for track_id, center, new in zip(ids.tolist(), centers.astype(np.int64).tolist(), is_new.tolist()):
+            if new:
+                self._history[track_id] = deque(maxlen=self.patience)
+            self._history[track_id].append((current_frame, center[0], center[1]))
+        return ids, is_new
+    
+    def _retire(self, current_frame: int):
+        """
+        Drops tracks that have not been seen within `frame_max` frames.
+
+        Args:
+            current_frame (int): Current frame number.
+        """
+        alive = np.abs(current_frame - self._last_frame) <= self.frame_max
+        if alive.all():
+            return
+        for track_id in self._ids[~alive].tolist():
+            del self._history[track_id]
+        self._ids = self._ids[alive]
+        self._last_pos = self._last_pos[alive]
+        self._velocity = self._velocity[alive]
+        self._last_frame = self._last_frame[alive]
+    
+    def predict(self, track_ids: np.ndarray, current_frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extrapolates how far tracks moved since they were last seen, without
+        updating them.
+
+        Args:
+            track_ids (numpy.ndarray): IDs of the tracks to extrapolate.
+            current_frame (int): Frame to extrapolate to.
+
+        Returns:
+            tuple: (N, 2) displacement of each track since its last observation, and a
+                boolean array that is False for tracks that are no longer live.
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        # IDs are allocated in increasing order and retiring keeps the order
+        idx = np.searchsorted(self._ids, track_ids)
+        idx = np.minimum(idx, max(len(self._ids) - 1, 0))
+        alive = np.zeros(len(track_ids), dtype=bool)
+        displacement = np.zeros((len(track_ids), 2), dtype=np.float64)
+        if len(self._ids):
+            alive = (self._ids[idx] == track_ids) & (np.abs(current_frame - self._last_frame[idx]) <= self.frame_max)
+            displacement[alive] = self._velocity[idx[alive]] * (current_frame - self._last_frame[idx[alive]])[:, None]
+        return displacement, alive
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the tracker state as compact arrays, e.g. for a checkpoint.
+
+        Returns:
+            dict: Arrays of the live tracks, the position history as (track, frame,
+                x, y) rows, and the next ID.
+        """
+        history = [
+            (track_id, frame, x, y)
+            for track_id, track_history in self._history.items()
+            for frame, x, y in track_history
+        ]
+        return {
+            "next_id": np.array(self.next_id, dtype=np.int64),
+            "ids": self._ids.copy(),
+            "last_pos": self._last_pos.copy(),
+            "last_frame": self._last_frame.copy(),
+            "velocity": self._velocity.copy(),
+            "history": np.array(history, dtype=np.int64).reshape(-1, 4)
+        }
+    
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """
+        Restores a state returned by get_state().
+
+        Args:
+            state (dict): Tracker state arrays.
+        """
+        self.next_id = int(state["next_id"])
+        self._ids = np.asarray(state["ids"], dtype=np.int64)
+        self._last_pos = np.asarray(state["last_pos"], dtype=np.float64).reshape(-1, 2)
+        self._last_frame = np.asarray(state["last_frame"], dtype=np.int64)
+        self._velocity = np.asarray(state["velocity"], dtype=np.float64).reshape(-1, 2)
+        self._history = {track_id: deque(maxlen=self.patience) for track_id in self._ids.tolist()}
+        for track_id, frame, x, y in np.asarray(state["history"]).tolist():
+            self._history[track_id].append((frame, x, y))
     
     def update_tracking(
         self,
@@ -27,7 +208,9 @@ class Tracker:
         current_frame: int
     ) -> Tuple[Dict[str, Dict[int, Tuple[int, int]]], str, bool, str]:
         """
-        Updates tracking information with the new object center.
+        Updates tracking information with a single object center.
+
+        Kept for compatibility; prefer update() with all detections of a frame.
 
         Args:
             obj_center (tuple): (x, y) coordinates of the detected object center.
@@ -36,43 +219,15 @@ class Tracker:
         Returns:
             tuple: Updated tracking dictionary, object ID, is_new flag, and last_key.
         """
-        is_new = False
-        lastpos = [
-            (k, list(center.keys())[-1], list(center.values())[-1])
-            for k, center in self.centers_old.items()
-        ]
-        lastpos = [
-            (k, pos) for k, frame, pos in lastpos
-            if abs(frame - current_frame) <= self.frame_max
-        ]
-        previous_pos = [
-            (k, pos) for k, pos in lastpos
-            if np.linalg.norm(np.array(pos) - np.array(obj_center)) < self.threshold_centers
-        ]
-        
-        if previous_pos:
-            obj_id = previous_pos[0][0]
-            self.centers_old[obj_id][current_frame] = obj_center
-        else:
-            if self.last_key:
-                last_num = int(self.last_key.replace('ID', ''))
-                obj_id = f'ID{last_num + 1}'
-            else:
-                obj_id = 'ID0'
-            is_new = True
-            self.centers_old[obj_id] = {current_frame: obj_center}
-            self.last_key = obj_id
-        
-        return self.centers_old, obj_id, is_new, self.last_key
+        ids, is_new = self.update(np.array([obj_center]), current_frame)
+        return self.centers_old, f'ID{ids[0]}', bool(is_new[0]), self.last_key
     
     def filter_tracks(self) -> Dict[str, Dict[int, Tuple[int, int]]]:
         """
-        Filters out old tracking information based on patience.
+        Returns the tracking history. History is bounded by `patience` as it is
+        recorded, so nothing needs to be dropped here.
 
         Returns:
             dict: Filtered tracking dictionary.
         """
-        filtered = {}
-        for k, frames in self.centers_old.items():
-            filtered[k] = dict(list(frames.items())[-self.patience:])
-        return filtered
\ No newline at end of file
+        return self.centers_old
\ No newline at end of file
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+from typing import List, Optional
+from src.config.config import MOTION_THRESHOLD, MOTION_PIXEL_DELTA, MOTION_GATE_SIZE
+
+class MotionGate:
+    """
+    Cheap frame-differencing check deciding whether a detector input changed.
+
+    Each input slot (an ROI crop, or the full-frame detection image) keeps a small
+    grayscale thumbnail of the image it was last detected on. A new image is only
+    reported as changed when enough thumbnail pixels differ from that reference,
+    so slow drift still accumulates until it triggers a new detection.
+    """
+    
+    def __init__(
+        self,
+        num_slots: int,
+        threshold: float = MOTION_THRESHOLD,
+        pixel_delta: int = MOTION_PIXEL_DELTA,
+        size: int = MOTION_GATE_SIZE
+    ):
+        """
+        Initializes the MotionGate.
+
+        Args:
+            num_slots (int): Number of detector inputs per frame.
+            threshold (float): Fraction of thumbnail pixels that must change.
+            pixel_delta (int): Gray-level difference above which a pixel counts as changed.
+            size (int): Side, in pixels, of the compared thumbnails.
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.references: List[Optional[np.ndarray]] = [None] * num_slots
+    
+    def _thumbnail(self, image: np.ndarray) -> np.ndarray:
+        """
+        Downscales an image to a grayscale thumbnail.
+
+        Args:
+            image (numpy.ndarray): BGR image.
+
+        Returns:
+            numpy.ndarray: (size, size) uint8 thumbnail.
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(image, (self.size, self.size), interpolation=cv2.INTER_AREA)
+    
+    def update(self, slot: int, image: np.ndarray) -> bool:
+        """
+        Checks whether the image of a slot changed since it was last detected on.
+
+        The reference of the slot is replaced when the image changed, since the
+        caller then runs the detector on it.
+
+        Args:
+            slot (int): Index of the detector input.
+            image (numpy.ndarray): Current image of the slot.
+
+        Returns:
+            bool: True when the detector should run on the image.
+        """
+        if image.size == 0:
+            return True
+        thumbnail = self._thumbnail(image)
+        reference = self.references[slot]
+        if reference is not None:
+            changed = cv2.absdiff(thumbnail, reference) > self.pixel_delta
+            if changed.mean() < self.threshold:
+                return False
+        self.references[slot] = thumbnail
+        return True
+    
+    def get_state(self) -> List[np.ndarray]:
+        """
+        Returns the reference thumbnail of every slot, empty for slots never detected.
+
+        Returns:
+            list: One uint8 array per slot.
+        """
+        return [
+            reference if reference is not None else np.empty((0, 0), dtype=np.uint8)
+            for reference in self.references
+        ]
+    
+    def set_state(self, references: List[np.ndarray]):
+        """
+        Restores the references returned by get_state().
+
+        Args:
+            references (list): One uint8 array per slot.
+        """
+        self.references = [reference if reference.size else None for reference in references]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+from src.config.config import ALPHA
+
+class ROIOverlay:
+    """
+    Blends the static ROI polygons into frames.
+
+    The polygons never change, so their mask is rasterised once and each frame is
+    only blended inside the bounding rectangles of the mask's connected regions
+    instead of copying and blending the whole frame.
+    """
+    
+    def __init__(
+        self,
+        rois: List[Dict],
+        frame_shape: Tuple[int, int],
+        color: Tuple[int, int, int] = (255, 0, 0),
+        alpha: float = ALPHA
+    ):
+        """
+        Initializes the ROIOverlay and precomputes the blend regions.
+
+        Args:
+            rois (list): List of ROI dictionaries with polygons.
+            frame_shape (tuple): (height, width) of the frames.
+            color (tuple): BGR fill color of the polygons.
+            alpha (float): Opacity of the polygons.
+        """
+        self.frame_shape = tuple(frame_shape[:2])
+        self.alpha = alpha
+        mask = np.zeros(self.frame_shape, dtype=np.uint8)
+        for roi in rois:
+            pts = np.array(roi['polygon'], dtype=np.int32)
+            cv2.polylines(mask, [pts], isClosed=True, color=1, thickness=2)
+            cv2.fillPoly(mask, [pts], 1)
+        
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask)
+        self.regions = []
+        for label in range(1, num_labels):
+            x, y, w, h = stats[label, :4]
+            region = (slice(y, y + h), slice(x, x + w))
+            region_mask = (labels[region] == label)[:, :, None]
+            color_patch = np.empty((h, w, 3), dtype=np.uint8)
+            color_patch[:] = color
+            self.regions.append((region, region_mask, color_patch))
+    
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Blends the ROI polygons into the frame in place.
+
+        Args:
+            frame (numpy.ndarray): The video frame.
+
+        Returns:
+            numpy.ndarray: The same frame, with the overlay blended in.
+        """
+        for region, region_mask, color_patch in self.regions:
+            patch = frame[region]
+            blended = cv2.addWeighted(color_patch, self.alpha, patch, 1 - self.alpha, 0)
+            np.copyto(patch, blended, where=region_mask)
+        return frame
\ No newline at end of file
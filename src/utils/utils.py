@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 
 def resize_frame(frame, scale_percent):
     """
@@ -15,4 +16,26 @@ def resize_frame(frame, scale_percent):
     height = int(frame.shape[0] * scale_percent / 100)
     dim = (width, height)
     resized = cv2.resize(frame, dim, interpolation=cv2.INTER_AREA)
-    return resized
\ No newline at end of file
+    return resized
+
+def points_in_polygon(points, polygon):
+    """
+    Tests which points lie inside a polygon using vectorised ray casting.
+
+    Args:
+        points (numpy.ndarray): Array of shape (N, 2) with (x, y) coordinates.
+        polygon (list): Polygon vertices as (x, y) pairs.
+
+    Returns:
+        numpy.ndarray: Boolean array of shape (N,), True for points inside the polygon.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    vertices = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = vertices[:, 0], vertices[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_intersect = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (x < x_intersect), axis=1) % 2 == 1
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""
+Video decoding and encoding through an ffmpeg subprocess.
+
+Raw BGR frames are piped from and to ffmpeg, so decoding and encoding run in a
+separate process, with any codec, hardware acceleration and thread count ffmpeg
+supports. Both classes mimic the parts of cv2.VideoCapture and cv2.VideoWriter
+the pipeline uses.
+"""
+
+import subprocess
+from typing import List, Optional, Tuple
+import numpy as np
+from src.config.config import (
+    FFMPEG_PATH, FFMPEG_CODEC, FFMPEG_CRF, FFMPEG_PRESET, FFMPEG_THREADS, FFMPEG_HWACCEL, FFMPEG_BUFFER_FRAMES
+)
+
+
+def _quality_args(codec: str, crf: int, preset: str) -> List[str]:
+    """
+    Builds the quality options of an encoder.
+
+    Args:
+        codec (str): ffmpeg encoder name.
+        crf (int): Constant quality level.
+        preset (str): Encoder preset.
+
+    Returns:
+        list: ffmpeg arguments.
+    """
+    if codec.endswith("_nvenc"):
+        return ["-cq", str(crf), "-preset", preset]
+    if codec.endswith("_qsv"):
+        return ["-global_quality", str(crf), "-preset", preset]
+    return ["-crf", str(crf), "-preset", preset]
+
+
+def _read_errors(process: subprocess.Popen) -> str:
+    """
+    Reads what an ffmpeg process reported on stderr.
+
+    Args:
+        process (subprocess.Popen): Finished ffmpeg process.
+
+    Returns:
+        str: Its error messages.
+    """
+    return process.stderr.read().decode(errors="replace").strip() if process.stderr else ""
+
+
+class FFmpegReader:
+    """
+    Decodes a video with ffmpeg into a pool of preallocated frame buffers.
+
+    Frames returned by read() are views of the pool and are overwritten once the
+    reader has cycled through it, so callers holding several frames at once must
+    reserve enough buffers with hold_frames().
+    """
+    
+    def __init__(
+        self,
+        video_path: str,
+        width: int,
+        height: int,
+        fps: float,
+        hwaccel: Optional[str] = FFMPEG_HWACCEL,
+        threads: int = FFMPEG_THREADS,
+        buffer_count: int = FFMPEG_BUFFER_FRAMES
+    ):
+        """
+        Initializes the FFmpegReader; ffmpeg is started by the first read().
+
+        Args:
+            video_path (str): Path to the input video file.
+            width (int): Width of the decoded frames.
+            height (int): Height of the decoded frames.
+            fps (float): Frame rate, used to convert frame indices to seek times.
+            hwaccel (str, optional): ffmpeg hardware decoding method.
+            threads (int): Decoder threads, 0 to let ffmpeg choose.
+            buffer_count (int): Number of frame buffers in the pool.
+        """
+        self.video_path = video_path
+        self.fps = fps
+        self.hwaccel = hwaccel
+        self.threads = threads
+        self.frame_shape = (height, width, 3)
+        self._buffers = [np.empty(self.frame_shape, dtype=np.uint8) for _ in range(max(1, buffer_count))]
+        self._next_buffer = 0
+        self._start_frame = 0
+        self._process: Optional[subprocess.Popen] = None
+    
+    def hold_frames(self, count: int):
+        """
+        Grows the buffer pool so that the last `count` frames read stay valid.
+
+        Args:
+            count (int): Number of frames the caller may hold at once.
+        """
+        # One more buffer than held frames, since read() fills the next one
+        while len(self._buffers) <= count:
+            self._buffers.append(np.empty(self.frame_shape, dtype=np.uint8))
+    
+    def _open(self):
+        """
+        Starts ffmpeg, decoding from the current start frame.
+        """
+        args = [FFMPEG_PATH, "-nostdin", "-loglevel", "error"]
+        if self.hwaccel:
+            args += ["-hwaccel", self.hwaccel]
+        args += ["-threads", str(self.threads)]
+        if self._start_frame > 0 and self.fps > 0:
+            args += ["-ss", f"{self._start_frame / self.fps:.6f}"]
+        # Passthrough timestamps, so no frame is duplicated or dropped
+        args += ["-i", self.video_path, "-map", "0:v:0", "-vsync", "0", "-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+        self._process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Decodes the next frame.
+
+        Returns:
+            tuple: Whether a frame was read, and the frame.
+        """
+        if self._process is None:
+            self._open()
+        buffer = self._buffers[self._next_buffer]
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            count = self._process.stdout.readinto(view[filled:])
+            if not count:
+                if self._process.wait() != 0:
+                    raise RuntimeError(f"ffmpeg failed to decode {self.video_path}: {_read_errors(self._process)}")
+                return False, None
+            filled += count
+        self._next_buffer = (self._next_buffer + 1) % len(self._buffers)
+        return True, buffer
+    
+    def seek(self, frame_idx: int):
+        """
+        Makes the next read() return the given frame, restarting ffmpeg at its time.
+
+        Args:
+            frame_idx (int): Index of the next frame to read.
+        """
+        self.release()
+        self._start_frame = frame_idx
+    
+    def release(self):
+        """
+        Stops ffmpeg.
+        """
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process.stdout.close()
+        self._process.stderr.close()
+        self._process = None
+
+
+class FFmpegWriter:
+    """
+    Encodes frames with ffmpeg, as a drop-in replacement for cv2.VideoWriter.
+    """
+    
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        frame_size: Tuple[int, int],
+        codec: str = FFMPEG_CODEC,
+        crf: int = FFMPEG_CRF,
+        preset: str = FFMPEG_PRESET,
+        threads: int = FFMPEG_THREADS
+    ):
+        """
+        Initializes the FFmpegWriter and starts ffmpeg.
+
+        Args:
+            output_path (str): Path of the encoded video; the container follows its extension.
+            fps (float): Frame rate of the video.
+            frame_size (tuple): (width, height) of the frames.
+            codec (str): ffmpeg encoder.
+            crf (int): Constant quality level.
+            preset (str): Encoder preset.
+            threads (int): Encoder threads, 0 to let ffmpeg choose.
+        """
+        width, height = frame_size
+        self.output_path = output_path
+        self.frame_shape = (height, width, 3)
+        args = [
+            FFMPEG_PATH, "-nostdin", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{fps}", "-i", "-",
+            "-an", "-c:v", codec, *_quality_args(codec, crf, preset), "-threads", str(threads),
+            # 4:2:0 chroma subsampling needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+            output_path
+        ]
+        self._process: Optional[subprocess.Popen] = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    
+    def isOpened(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        """
+        Sends a frame to the encoder.
+
+        Args:
+            frame (numpy.ndarray): BGR frame of the writer's size.
+        """
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame of shape {frame.shape} written to a {self.frame_shape} video")
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"ffmpeg stopped encoding {self.output_path}: {_read_errors(self._process)}")
+    
+    def release(self):
+        """
+        Flushes the encoder and waits for the video to be finalised.
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {self.output_path}: {_read_errors(process)}")
+        process.stderr.close()
\ No newline at end of file
@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+import cv2
+from typing import Dict, Optional, Tuple
+import numpy as np
+from src.video.video_processor import VideoProcessor, create_video_writer
+from src.utils.utils import resize_frame
+from src.config.config import VIDEO_SCALE_PERCENT, STREAM_READ_TIMEOUT
+
+class LiveSource(VideoProcessor):
+    """
+    Reads a live source (webcam, RTSP/HTTP stream, or a file replayed in real
+    time) without ever building a backlog.
+
+    A capture thread reads frames as fast as the source delivers them and keeps
+    only the latest one. When processing falls behind, older frames are
+    overwritten and counted as dropped, so latency stays bounded.
+    """
+    
+    def __init__(self, source: str, loop: bool = False, read_timeout: float = STREAM_READ_TIMEOUT):
+        """
+        Opens the live source.
+
+        Args:
+            source (str): Capture URL, file path, or camera device index such as "0".
+            loop (bool): Restart a file source at its end, to simulate an endless camera.
+            read_timeout (float): Seconds without a new frame after which the
+                stream is considered ended.
+        """
+        self.video_path = str(source)
+        capture_source = int(source) if self.video_path.isdigit() else self.video_path
+        self.cap = cv2.VideoCapture(capture_source)
+        if not self.cap.isOpened():
+            raise ValueError(f"Unable to open video source: {source}")
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        # Live sources have no known length
+        self.frame_count = 0
+        self.apply_scaling()
+        
+        # Files are paced at their frame rate so they behave like a camera
+        self.is_file = isinstance(capture_source, str) and os.path.isfile(capture_source)
+        self.loop = loop
+        self.read_timeout = read_timeout
+        self.frames_read = 0
+        self.frames_delivered = 0
+        self.dropped = 0
+        self._frame: Optional[np.ndarray] = None
+        self._frame_time = 0.0
+        self._condition = threading.Condition()
+        self._ended = False
+        self._closed = False
+        self._started_at: Optional[float] = None
+        self._thread = threading.Thread(target=self._capture, name="live-capture", daemon=True)
+    
+    def _capture(self):
+        """
+        Capture thread: reads the source and replaces the pending frame.
+        """
+        interval = 1.0 / self.fps if self.is_file and self.fps > 0 else 0.0
+        next_time = time.perf_counter()
+        frames_since_rewind = 0
+        while not self._closed:
+            is_frame, frame = self.cap.read()
+            if not is_frame:
+                if self.is_file and self.loop and frames_since_rewind:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    frames_since_rewind = 0
+                    continue
+                break
+            frames_since_rewind += 1
+            if interval:
+                next_time += interval
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+            with self._condition:
+                if self._frame is not None:
+                    self.dropped += 1
+                self._frame = frame
+                self._frame_time = time.perf_counter()
+                self.frames_read += 1
+                self._condition.notify_all()
+        with self._condition:
+            self._ended = True
+            self._condition.notify_all()
+    
+    def _start(self):
+        """
+        Starts the capture thread on the first read.
+        """
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+            self._thread.start()
+    
+    @property
+    def ended(self) -> bool:
+        """
+        True once the source stopped delivering and its last frame was returned.
+        """
+        return self._ended and self._frame is None
+    
+    def poll(self) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Returns the newest frame not returned yet, without waiting.
+
+        Returns:
+            tuple: The frame, or None when no new frame arrived, and the
+                time.perf_counter() time it was captured at.
+        """
+        self._start()
+        with self._condition:
+            frame, captured_at, self._frame = self._frame, self._frame_time, None
+        if frame is None:
+            return None, 0.0
+        self.frames_delivered += 1
+        return frame, captured_at
+    
+    def get_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Waits for the newest frame not returned yet.
+
+        Returns:
+            tuple: (True, frame), or (False, None) once the stream ended or stalled
+                for longer than read_timeout.
+        """
+        self._start()
+        deadline = time.perf_counter() + self.read_timeout
+        with self._condition:
+            while self._frame is None and not self._ended:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False, None
+                self._condition.wait(min(remaining, 0.1))
+            frame, self._frame = self._frame, None
+        if frame is None:
+            return False, None
+        self.frames_delivered += 1
+        return True, frame
+    
+    def read_preview_frame(self) -> np.ndarray:
+        """
+        Reads the current frame, scaled like processed frames.
+
+        Returns:
+            numpy.ndarray: The scaled frame.
+        """
+        is_frame, frame = self.get_frame()
+        if not is_frame:
+            raise ValueError(f"Unable to read a frame from: {self.video_path}")
+        if VIDEO_SCALE_PERCENT != 100:
+            frame = resize_frame(frame, VIDEO_SCALE_PERCENT)
+        return frame
+    
+    def hold_frames(self, count: int):
+        """
+        Every frame of a live source is a new array, so held frames stay valid.
+
+        Args:
+            count (int): Ignored.
+        """
+    
+    def seek(self, frame_idx: int):
+        """
+        Live sources cannot seek; processing starts at the current frame.
+
+        Args:
+            frame_idx (int): Ignored.
+        """
+    
+    def stats(self) -> Dict[str, Optional[float]]:
+        """
+        Returns the rates measured since the first frame was requested.
+
+        Returns:
+            dict: Nominal source fps, measured source fps, achieved (delivered) fps
+                and the number of dropped frames.
+        """
+        elapsed = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "nominal_fps": round(self.fps, 2) if self.fps > 0 else None,
+            "source_fps": round(self.frames_read / elapsed, 2) if elapsed > 0 else None,
+            "achieved_fps": round(self.frames_delivered / elapsed, 2) if elapsed > 0 else None,
+            "dropped_frames": self.dropped
+        }
+    
+    def release(self):
+        """
+        Stops the capture thread and releases the source.
+        """
+        self._closed = True
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.read_timeout)
+        # A read still blocked on the network keeps the capture; the daemon thread exits with it
+        if not self._thread.is_alive():
+            self.cap.release()
+    
+    def get_video_writer(self, output_path: str):
+        """
+        Initializes a VideoWriter for the annotated stream.
+
+        Args:
+            output_path (str): Path to save the annotated video.
+
+        Returns:
+            cv2.VideoWriter or FFmpegWriter: The writer of the configured I/O backend.
+        """
+        # Streams often do not report a rate; fall back to a common camera rate
+        return create_video_writer(output_path, self.fps if self.fps > 0 else 25.0, (self.width, self.height))
\ No newline at end of file
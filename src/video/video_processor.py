@@ -1,20 +1,54 @@
+import os
+import shutil
+import subprocess
+import tempfile
 import cv2
-from typing import Tuple
-from src.config.config import VIDEO_SCALE_PERCENT, VIDEO_CODEC
+from typing import List, Tuple
+from src.config.config import VIDEO_SCALE_PERCENT, VIDEO_CODEC, VIDEO_IO_BACKEND, FFMPEG_PATH
+from src.utils.utils import resize_frame
+from src.video.ffmpeg_io import FFmpegReader, FFmpegWriter
+
+VIDEO_IO_BACKENDS = ("opencv", "ffmpeg")
+
+
+def create_video_writer(output_path: str, fps: float, frame_size: Tuple[int, int], backend: str = VIDEO_IO_BACKEND):
+    """
+    Creates a video writer with the configured I/O backend.
+
+    Args:
+        output_path (str): Path to save the video.
+        fps (float): Frame rate of the video.
+        frame_size (tuple): (width, height) of the frames.
+        backend (str): "opencv" or "ffmpeg".
+
+    Returns:
+        cv2.VideoWriter or FFmpegWriter: Writer with write() and release().
+    """
+    if backend == "ffmpeg":
+        return FFmpegWriter(output_path, fps, frame_size)
+    if backend != "opencv":
+        raise ValueError(f"Unknown video I/O backend: {backend}")
+    return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*VIDEO_CODEC), fps, frame_size)
+
 
 class VideoProcessor:
     """
     Handles video loading, resizing, and saving operations.
     """
     
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, backend: str = VIDEO_IO_BACKEND):
         """
         Initializes the VideoProcessor with the given video path.
 
         Args:
             video_path (str): Path to the input video file.
+            backend (str): "opencv" to decode with cv2.VideoCapture, or "ffmpeg" to
+                decode in an ffmpeg subprocess into reusable buffers, see hold_frames().
         """
+        if backend not in VIDEO_IO_BACKENDS:
+            raise ValueError(f"Unknown video I/O backend: {backend}")
         self.video_path = video_path
+        self.backend = backend
         self.cap = cv2.VideoCapture(video_path)
         if not self.cap.isOpened():
             raise ValueError(f"Unable to open video file: {video_path}")
@@ -22,6 +56,11 @@ class VideoProcessor:
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.fps = self.cap.get(cv2.CAP_PROP_FPS)
         self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._reader = None
+        if backend == "ffmpeg":
+            # The capture is only used to read the video properties
+            self._reader = FFmpegReader(video_path, self.width, self.height, self.fps)
+            self.cap.release()
         self.apply_scaling()
     
     def apply_scaling(self):
@@ -39,12 +78,61 @@ class VideoProcessor:
         Returns:
             tuple: A tuple containing a boolean indicating success and the frame.
         """
+        if self._reader is not None:
+            return self._reader.read()
         return self.cap.read()
     
+    def hold_frames(self, count: int):
+        """
+        Declares how many decoded frames the caller holds at once.
+
+        The ffmpeg backend decodes into a pool of reused buffers; it grows the pool
+        so that the last `count` frames returned by get_frame() are not overwritten.
+
+        Args:
+            count (int): Number of frames held at once.
+        """
+        if self._reader is not None:
+            self._reader.hold_frames(count)
+    
+    def read_preview_frame(self):
+        """
+        Reads the first frame, scaled like processed frames, and rewinds the video.
+
+        Returns:
+            numpy.ndarray: The scaled first frame.
+        """
+        is_frame, frame = self.get_frame()
+        if not is_frame:
+            raise ValueError(f"Unable to read a frame from: {self.video_path}")
+        if self._reader is not None:
+            # The frame is a reused decode buffer
+            frame = frame.copy()
+            self._reader.seek(0)
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        if VIDEO_SCALE_PERCENT != 100:
+            frame = resize_frame(frame, VIDEO_SCALE_PERCENT)
+        return frame
+    
+    def seek(self, frame_idx: int):
+        """
+        Moves the capture so that the next get_frame() returns the given frame.
+
+        Args:
+            frame_idx (int): Index of the next frame to read.
+        """
+        if self._reader is not None:
+            self._reader.seek(frame_idx)
+        elif frame_idx > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    
     def release(self):
         """
         Releases the video capture object.
         """
+        if self._reader is not None:
+            self._reader.release()
         self.cap.release()
     
     def get_video_writer(self, output_path: str):
@@ -55,11 +143,51 @@ class VideoProcessor:
             output_path (str): Path to save the annotated video.
 
         Returns:
-            cv2.VideoWriter: The VideoWriter object.
-        """
-        return cv2.VideoWriter(
-            output_path,
-            cv2.VideoWriter_fourcc(*VIDEO_CODEC),
-            self.fps,
-            (self.width, self.height)
-        )
\ No newline at end of file
+            cv2.VideoWriter or FFmpegWriter: The writer of the configured I/O backend.
+        """
+        return create_video_writer(output_path, self.fps, (self.width, self.height), self.backend)
+
+def concatenate_videos(part_paths: List[str], output_path: str):
+    """
+    Joins video files with identical encoding settings into one video.
+
+    Uses the ffmpeg concat demuxer (no re-encoding) when ffmpeg is available,
+    otherwise re-encodes the parts with OpenCV.
+
+    Args:
+        part_paths (list): Paths of the videos to join, in order.
+        output_path (str): Path of the joined video.
+    """
+    if shutil.which(FFMPEG_PATH):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            for path in part_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+            list_path = f.name
+        try:
+            subprocess.run(
+                [FFMPEG_PATH, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", output_path],
+                check=True
+            )
+        finally:
+            os.remove(list_path)
+        return
+    
+    writer = None
+    for path in part_paths:
+        cap = cv2.VideoCapture(path)
+        if writer is None:
+            writer = cv2.VideoWriter(
+                output_path,
+                cv2.VideoWriter_fourcc(*VIDEO_CODEC),
+                cap.get(cv2.CAP_PROP_FPS),
+                (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            )
+        while True:
+            is_frame, frame = cap.read()
+            if not is_frame:
+                break
+            writer.write(frame)
+        cap.release()
+    if writer is not None:
+        writer.release()
\ No newline at end of file